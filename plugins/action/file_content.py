@@ -0,0 +1,18 @@
+# copyright (c) 2024, Matthias Dellweg
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+from ansible_collections.pulp.squeezer.plugins.plugin_utils.controller_upload import (
+    ControllerUploadAction,
+)
+
+
+class ActionModule(ControllerUploadAction):
+    def module_args(self, args, sha256, artifact_href):
+        args = dict(args, sha256=sha256, artifact=artifact_href)
+        args.pop("file")
+        return args
@@ -47,6 +47,23 @@ options:
       - Time in seconds to wait for tasks.
     type: int
     default: 10
+  task_poll_interval:
+    description:
+      - Time in seconds to wait before polling an unfinished task for the first time.
+      - The interval doubles with every poll until it reaches I(task_poll_max_interval).
+    type: float
+    default: 0.05
+  task_poll_max_interval:
+    description:
+      - Maximal time in seconds to wait between polls of an unfinished task.
+    type: float
+    default: 2.0
+  max_queue_depth:
+    description:
+      - Hold back the first request that may dispatch a task until there are fewer waiting tasks than this multiple of the online workers.
+      - The queue is checked with increasing pauses of up to 30 seconds, for at most I(timeout) seconds.
+      - If not set, tasks are dispatched right away.
+    type: float
 """
 
     GLUE = r"""
@@ -78,6 +95,125 @@ options:
       - absent
 """
 
+    ENTITY_INFO = r"""
+options:
+  count_only:
+    description:
+      - Only report the number of matching entities in C(count) instead of listing them.
+      - All identifying parameters that are specified are used as filters.
+      - This issues a single request regardless of the number of matches.
+      - Cannot be used together with I(state).
+    type: bool
+    default: false
+"""
+
+    ENTITY_LIST = r"""
+options:
+  pagination:
+    description:
+      - Strategy to page through the entities when listing them.
+      - C(keyset) continues every page after the creation time of the last entity received
+        instead of letting the server skip C(offset) rows, so the cost per page stays flat on large collections.
+      - C(keyset) needs the C(pulp_created) filters on the list endpoint; otherwise C(offset) is used with a warning.
+    type: str
+    choices:
+      - offset
+      - keyset
+    default: offset
+  pulp_label_select:
+    description:
+      - Only list entities whose labels match this selector.
+      - The selector is evaluated by the server and consists of comma separated terms
+        like C(env=prod), C(tier!=web), C(team~ops) or C(owner).
+      - Only applies when listing or counting entities.
+    type: str
+"""
+
+    TASK = r"""
+options:
+  wait:
+    description:
+      - Whether to wait for dispatched tasks to finish.
+      - If set to false, the module returns the href of the first task it dispatched in I(task) right away.
+        Use the M(pulp.squeezer.task) module to collect the result later.
+      - Operations that dispatch a task group return its href in I(task_group) instead.
+        It can be waited for with the M(pulp.squeezer.task_group) module.
+      - If a task is still running after I(timeout), the module fails with I(still_running) set and the task href in I(task).
+        Every such task is remembered, and the next run with the same parameters waits for it again instead of dispatching a new one for the same operation.
+    type: bool
+    default: true
+"""
+
+    PROGRESS = r"""
+options:
+  progress_file:
+    description:
+      - Append snapshots of the progress reports to this file as JSON lines while waiting for the task.
+    type: path
+  progress_journal:
+    description:
+      - Send snapshots of the progress reports to the system log while waiting for the task.
+      - The systemd journal is used if the C(systemd) python bindings are available on the target.
+    type: bool
+    default: false
+  progress_interval:
+    description:
+      - Minimal time in seconds between two progress snapshots.
+    type: float
+    default: 10
+"""
+
+    UPLOAD = r"""
+options:
+  upload_concurrency:
+    description:
+      - Number of chunks to upload at the same time when uploading a file in chunks.
+    type: int
+    default: 4
+  upload_retries:
+    description:
+      - Number of times to retry uploading a chunk before giving up.
+    type: int
+    default: 3
+  digest_cache:
+    description:
+      - Remember the sha256 digest of the file in the squeezer cache directory on the managed node.
+      - The digest is reused as long as device, inode, size, modification time and path of the file are unchanged.
+        This avoids reading the whole file when it is already present on the server.
+    type: bool
+    default: false
+  resume_upload:
+    description:
+      - Keep a chunked upload that failed on the server and continue it with the next attempt.
+      - The upload and its acknowledged chunks are remembered in the squeezer cache directory on the managed node,
+        keyed by the sha256 digest of the file and the pulp_url. Only the chunks missing on the server are sent again.
+      - The C(chunk_size) must not change between attempts.
+    type: bool
+    default: false
+  max_upload_rate:
+    description:
+      - Maximum number of bytes per second to upload, e.g. C(10M).
+      - The limit applies to all chunks sent at the same time together. It is enforced per chunk,
+        so smaller chunks give a smoother rate.
+      - Files sent in a single request, and all files uploaded to servers older than pulpcore 3.20,
+        are accounted for as a whole before they are sent.
+      - By default, uploads are not limited.
+    type: str
+  upload_lock:
+    description:
+      - Lock the sha256 digest of the file while uploading it.
+      - Of several hosts uploading the same file, only the first one uploads it. The others wait for the upload to
+        finish and then use its result.
+      - The hosts need to share the C(upload_lock_dir), e.g. by delegating the task to the controller or by a network file system.
+    type: bool
+    default: false
+  upload_lock_dir:
+    description:
+      - Directory to keep the upload locks in.
+      - Defaults to C(squeezer/locks) in the cache directory of the user.
+    type: path
+"""
+
     READONLY_ENTITY_STATE = r"""
 options:
   state:
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+
+# copyright (c) 2024, Matthias Dellweg
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+
+
+def cache_dir(*parts):
+    """
+    Return a path in the squeezer cache directory of the user, which follows XDG_CACHE_HOME.
+    """
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME") or "~/.cache"
+    return os.path.join(os.path.expanduser(xdg_cache_home), "squeezer", *parts)
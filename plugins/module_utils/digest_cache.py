@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+# copyright (c) 2024, Matthias Dellweg
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+from ansible_collections.pulp.squeezer.plugins.module_utils.cache import cache_dir
+
+# Files modified this recently may still change within the resolution of their mtime.
+RACY_SECONDS = 2
+
+
+class DigestCache(object):
+    """
+    Remember the sha256 digests of local files across invocations.
+
+    A digest is reused as long as device, inode, size, modification time and path of the file
+    are unchanged. The least recently used entries are evicted beyond `max_entries`.
+    Lookups are safe to run from several threads. New digests are only written by calling
+    `save`, and a run that only hits the cache does not write anything.
+    """
+
+    def __init__(self, path=None, max_entries=100000):
+        if path is None:
+            path = cache_dir("digests.json")
+        self.path = path
+        self.max_entries = max_entries
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path):
+        path = os.path.realpath(path)
+        stat = os.stat(path)
+        key = "{0}:{1}:{2}:{3}:{4}".format(
+            stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, path
+        )
+        return key, stat
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path) as f:
+                    self._entries = json.load(f)
+            except (IOError, OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                self._save()
+            except (IOError, OSError):
+                # The cache is an optimization only.
+                pass
+            self._dirty = False
+
+    def _save(self):
+        entries = self._load()
+        if len(entries) > self.max_entries:
+            keep = sorted(entries, key=lambda key: entries[key]["used"])[-self.max_entries :]
+            entries = {key: entries[key] for key in keep}
+            self._entries = entries
+        directory = os.path.dirname(self.path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, "w") as f:
+            json.dump(entries, f)
+        os.rename(tmp_path, self.path)
+
+    def sha256(self, path, compute):
+        """
+        Return the digest of the file at `path`, calling `compute(path)` only on a cache miss.
+        """
+        key, stat = self._key(path)
+        now = time.time()
+        with self._lock:
+            entry = self._load().get(key)
+            if entry is not None:
+                # Only written along with new entries.
+                entry["used"] = now
+                return entry["sha256"]
+        digest = compute(path)
+        if now - stat.st_mtime < RACY_SECONDS:
+            return digest
+        with self._lock:
+            self._load()[key] = {"sha256": digest, "used": now}
+            self._dirty = True
+        return digest
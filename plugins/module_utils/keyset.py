@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+# copyright (c) 2024, Matthias Dellweg
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+KEYSET_FIELD = "pulp_created"
+
+
+class KeysetError(Exception):
+    pass
+
+
+def keyset_supported(query_params):
+    """
+    Return whether a list endpoint with these query parameters can be paged by creation time.
+    """
+    return "ordering" in query_params and KEYSET_FIELD + "__gte" in query_params
+
+
+def keyset_iterator(list_page, parameters, batch_size, entities_name="entities"):
+    """
+    List entities ordered by creation time, resuming each page after the last entity seen.
+
+    Unlike offset pagination, the server does not need to skip over already seen rows,
+    so the cost per page stays the same for large collections.
+    `list_page(parameters)` returns one page of the list endpoint.
+    A projection in `fields` is extended by the fields needed to continue the pages.
+    """
+    payload = dict(parameters)
+    if payload.get("fields"):
+        payload["fields"] = list(payload["fields"]) + [
+            field for field in ["pulp_href", KEYSET_FIELD] if field not in payload["fields"]
+        ]
+    payload.update({"ordering": [KEYSET_FIELD], "offset": 0, "limit": batch_size})
+    boundary_hrefs = set()
+    while True:
+        response = list_page(payload)
+        # Entities sharing the boundary timestamp are returned again and need to be skipped.
+        entities = [
+            entity for entity in response["results"] if entity["pulp_href"] not in boundary_hrefs
+        ]
+        if not entities:
+            if response["next"]:
+                raise KeysetError(
+                    "Too many {0} share the same creation time to use keyset pagination.".format(
+                        entities_name
+                    )
+                )
+            break
+        for entity in entities:
+            yield entity
+        boundary = entities[-1][KEYSET_FIELD]
+        if boundary != payload.get(KEYSET_FIELD + "__gte"):
+            boundary_hrefs = set()
+        boundary_hrefs.update(
+            entity["pulp_href"] for entity in entities if entity[KEYSET_FIELD] == boundary
+        )
+        payload[KEYSET_FIELD + "__gte"] = boundary
+        if not response["next"]:
+            break
@@ -31,6 +31,78 @@ else:
     makedirs = os.makedirs
 
 
+class FileSlice:
+    """
+    Part of a file to be sent in a request body without reading it into memory at once.
+    """
+
+    def __init__(self, path, offset=0, length=None):
+        self.path = path
+        self.offset = offset
+        if length is None:
+            length = os.path.getsize(path) - offset
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def blocks(self, block_size):
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            remaining = self.length
+            while remaining > 0:
+                block = f.read(min(block_size, remaining))
+                if not block:
+                    raise IOError("File {0} changed while uploading.".format(self.path))
+                remaining -= len(block)
+                yield block
+
+
+class MultipartBody:
+    """
+    File like request body joining the parts of a multipart form with CRLF while it is read.
+
+    Parts are bytes or `FileSlice`s. The length is known up front, and the memory needed does
+    not depend on the size of the files.
+    """
+
+    BLOCK_SIZE = 65536
+
+    def __init__(self, parts):
+        self.parts = parts
+        self._blocks = self._iter_blocks()
+        self._block = b""
+        self._pos = 0
+
+    def __len__(self):
+        return sum(len(part) for part in self.parts) + 2 * (len(self.parts) - 1)
+
+    def _iter_blocks(self):
+        for index, part in enumerate(self.parts):
+            if index:
+                yield b"\r\n"
+            if isinstance(part, FileSlice):
+                for block in part.blocks(self.BLOCK_SIZE):
+                    yield block
+            elif part:
+                yield part
+
+    def read(self, size=-1):
+        result = []
+        while size != 0:
+            if self._pos >= len(self._block):
+                self._block = next(self._blocks, b"")
+                self._pos = 0
+                if not self._block:
+                    break
+            end = len(self._block) if size < 0 else min(len(self._block), self._pos + size)
+            result.append(self._block[self._pos : end])
+            if size > 0:
+                size -= end - self._pos
+            self._pos = end
+        return b"".join(result)
+
+
 class OpenAPI:
     def __init__(
         self,
@@ -110,6 +182,24 @@ class OpenAPI:
             "GET", urljoin(self.base_url, self.doc_path), unix_socket=self.unix_socket
         ).read()
 
+    def param_spec(self, operation_id, param_type):
+        method, path = self.operations[operation_id]
+        path_spec = self.api_spec["paths"][path]
+        method_spec = path_spec[method]
+        param_spec = {
+            entry["name"]: entry
+            for entry in path_spec.get("parameters", [])
+            if entry["in"] == param_type
+        }
+        param_spec.update(
+            {
+                entry["name"]: entry
+                for entry in method_spec.get("parameters", [])
+                if entry["in"] == param_type
+            }
+        )
+        return param_spec
+
     def extract_params(self, param_type, path_spec, method_spec, params):
         param_spec = {
             entry["name"]: entry
@@ -181,7 +271,7 @@ class OpenAPI:
                         ]
                     )
                 form.append(part_boundary + b"--")
-                data = b"\r\n".join(form)
+                data = MultipartBody(form)
                 headers["Content-Type"] = "multipart/form-data; boundary={boundary}".format(
                     boundary=boundary
                 )
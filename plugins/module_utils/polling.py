@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+# copyright (c) 2024, Matthias Dellweg
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import random
+import time
+
+
+class PollingPolicy(object):
+    """
+    Intervals to wait between polls of an unfinished task.
+
+    Short tasks are picked up after a few milliseconds, while the interval for long running
+    tasks grows exponentially up to a cap. Some jitter is added to keep concurrent pollers from
+    hitting the server in lockstep.
+    """
+
+    def __init__(self, initial_interval=0.05, max_interval=2.0, factor=2.0, jitter=0.2):
+        if initial_interval <= 0:
+            raise ValueError("The initial polling interval must be positive.")
+        if max_interval < initial_interval:
+            raise ValueError("The maximal polling interval must not be below the initial one.")
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.factor = factor
+        self.jitter = jitter
+
+    def intervals(self):
+        interval = self.initial_interval
+        while True:
+            yield min(
+                self.max_interval, interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+            )
+            interval = min(self.max_interval, interval * self.factor)
+
+
+class QueueTimeout(Exception):
+    pass
+
+
+def wait_for_queue(call, max_queue_depth, timeout=None):
+    """
+    Return once fewer tasks are waiting than `max_queue_depth` times the online workers.
+
+    `call(operation_id, parameters=...)` queries the pulp api. The queue is checked with
+    increasing pauses of up to 30 seconds, for at most `timeout` seconds.
+    """
+    deadline = time.time() + timeout if timeout else None
+    intervals = PollingPolicy(initial_interval=1.0, max_interval=30.0).intervals()
+    while True:
+        waiting = call("tasks_list", parameters={"state": "waiting", "limit": 1, "offset": 0})[
+            "count"
+        ]
+        workers = call("workers_list", parameters={"online": True, "limit": 1, "offset": 0})[
+            "count"
+        ]
+        if waiting < max_queue_depth * max(workers, 1):
+            return
+        if deadline is not None and time.time() > deadline:
+            raise QueueTimeout(
+                "Waiting for the task queue to drain timed out"
+                " ({0} tasks waiting for {1} workers).".format(waiting, workers)
+            )
+        time.sleep(next(intervals))
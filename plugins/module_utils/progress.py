@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+# copyright (c) 2024, Matthias Dellweg
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import time
+
+FINISHED_STATES = ["completed", "failed", "canceled", "skipped"]
+
+
+class ProgressRecorder(object):
+    """
+    Take snapshots of the progress reports of a task while it is waited for.
+
+    Instances are meant to be registered as poll callback. A snapshot is taken at most every
+    `interval` seconds and once the task is finished. Each snapshot is appended to `path` as a
+    JSON line and sent to the system log if `journal` is set.
+    """
+
+    def __init__(self, module, path=None, journal=False, interval=10.0, max_points=20):
+        self.module = module
+        self.path = path
+        self.journal = journal
+        self.interval = interval
+        self.max_points = max_points
+        self.snapshots = []
+        self._start = None
+        self._last = None
+
+    def __call__(self, task):
+        now = time.time()
+        if self._start is None:
+            self._start = now
+        finished = task.get("state") in FINISHED_STATES
+        if self._last is not None and now - self._last[0] < self.interval and not finished:
+            return
+
+        progress = {report["code"]: report["done"] for report in task.get("progress_reports") or []}
+        rate = {}
+        if self._last is not None and now > self._last[0]:
+            rate = {
+                code: round((done - self._last[1].get(code, 0)) / (now - self._last[0]), 2)
+                for code, done in progress.items()
+            }
+        snapshot = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now)),
+            "elapsed": round(now - self._start, 1),
+            "task": task["pulp_href"],
+            "state": task["state"],
+            "progress": progress,
+            "rate": rate,
+        }
+        self._last = (now, progress)
+        self.snapshots.append(snapshot)
+
+        if self.path is not None:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(snapshot) + "\n")
+        if self.journal:
+            self.module.log(
+                "Task {0} {1}: {2}".format(
+                    snapshot["task"],
+                    snapshot["state"],
+                    ", ".join("{0}={1}".format(code, done) for code, done in progress.items()),
+                ),
+                log_args={"SQUEEZER_TASK": snapshot["task"], "SQUEEZER_STATE": snapshot["state"]},
+            )
+
+    def series(self):
+        """
+        Return at most `max_points` evenly spread snapshots, always including the last one.
+        """
+        if len(self.snapshots) <= self.max_points:
+            return list(self.snapshots)
+        step = (len(self.snapshots) - 1) / (self.max_points - 1)
+        return [self.snapshots[int(round(i * step))] for i in range(self.max_points)]
+
+
+def record_progress(module, poll_callbacks):
+    """
+    Register a `ProgressRecorder` as selected by the module parameters in `poll_callbacks`.
+
+    The recorded series is kept up to date in the `progress` result of the module.
+    """
+    recorder = ProgressRecorder(
+        module,
+        path=module.params["progress_file"],
+        journal=module.params["progress_journal"],
+        interval=module.params["progress_interval"],
+    )
+
+    def _callback(task):
+        recorder(task)
+        module.set_result("progress", recorder.series())
+
+    poll_callbacks.append(_callback)
@@ -18,7 +18,23 @@ from ansible.module_utils.basic import AnsibleModule, env_fallback
 
 # from ansible.module_utils.common import yaml
 from ansible.module_utils.six.moves.urllib.error import HTTPError
-from ansible_collections.pulp.squeezer.plugins.module_utils.openapi import OpenAPI
+from ansible_collections.pulp.squeezer.plugins.module_utils.keyset import (
+    KeysetError,
+    keyset_iterator,
+    keyset_supported,
+)
+from ansible_collections.pulp.squeezer.plugins.module_utils.openapi import FileSlice, OpenAPI
+from ansible_collections.pulp.squeezer.plugins.module_utils.polling import (
+    PollingPolicy,
+    QueueTimeout,
+    wait_for_queue,
+)
+from ansible_collections.pulp.squeezer.plugins.module_utils.progress import record_progress
+from ansible_collections.pulp.squeezer.plugins.module_utils.resumable import ResumableUpload
+from ansible_collections.pulp.squeezer.plugins.module_utils.upload import (
+    rate_limit_from_param,
+    upload_chunks,
+)
 
 PAGE_LIMIT = 20
 CONTENT_CHUNK_SIZE = 512 * 1024  # 1/2 MB
@@ -43,6 +59,33 @@ def pulp_parse_version(version_str):
     return [try_convert_int(i) for i in re.split(r"[\.\-]", version_str)]
 
 
+class PulpOpenAPI(OpenAPI):
+    """
+    OpenAPI that holds back the first call that may dispatch a task, if `max_queue_depth` is set,
+    until there are fewer waiting tasks than this multiple of the online workers.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.max_queue_depth = kwargs.pop("max_queue_depth", None)
+        super(PulpOpenAPI, self).__init__(*args, **kwargs)
+        self.timeout = kwargs.get("timeout")
+        self._dispatching = False
+
+    def call(self, operation_id, parameters=None, body=None, uploads=None):
+        if self.operations[operation_id][0] != "get" and not self._dispatching:
+            self._dispatching = True
+            if self.max_queue_depth is not None:
+                try:
+                    wait_for_queue(
+                        super(PulpOpenAPI, self).call, self.max_queue_depth, self.timeout
+                    )
+                except QueueTimeout as e:
+                    raise SqueezerException(str(e))
+        return super(PulpOpenAPI, self).call(
+            operation_id, parameters=parameters, body=body, uploads=uploads
+        )
+
+
 class PulpAnsibleModule(AnsibleModule):
     def __init__(self, **kwargs):
         argument_spec = {
@@ -60,17 +103,28 @@ class PulpAnsibleModule(AnsibleModule):
             },
             "refresh_api_cache": {"type": "bool", "default": False},
             "timeout": {"type": "int", "required": False, "default": 10},
+            "task_poll_interval": {"type": "float", "default": 0.05},
+            "task_poll_max_interval": {"type": "float", "default": 2.0},
+            "max_queue_depth": {"type": "float"},
         }
         argument_spec.update(kwargs.pop("argument_spec", {}))
         supports_check_mode = kwargs.pop("supports_check_mode", True)
         super(PulpAnsibleModule, self).__init__(
             argument_spec=argument_spec, supports_check_mode=supports_check_mode, **kwargs
         )
+        try:
+            self.polling_policy = PollingPolicy(
+                initial_interval=self.params["task_poll_interval"],
+                max_interval=self.params["task_poll_max_interval"],
+            )
+        except ValueError as e:
+            self.fail_json(msg=str(e))
+        self.poll_callbacks = []
 
     def __enter__(self):
         self._changed = False
         self._results = {}
-        self.pulp_api = OpenAPI(
+        self.pulp_api = PulpOpenAPI(
             base_url=self.params["pulp_url"],
             doc_path="/pulp/api/v3/docs/api.json",
             username=self.params["username"],
@@ -78,6 +132,7 @@ class PulpAnsibleModule(AnsibleModule):
             validate_certs=self.params["validate_certs"],
             refresh_cache=self.params["refresh_api_cache"],
             timeout=self.params["timeout"],
+            max_queue_depth=self.params["max_queue_depth"],
         )
 
         return self
@@ -109,6 +164,15 @@ class PulpAnsibleModule(AnsibleModule):
     def set_result(self, key, value):
         self._results[key] = value
 
+    def record_progress(self):
+        record_progress(self, self.poll_callbacks)
+
+    def upload_rate_limit(self):
+        try:
+            return rate_limit_from_param(self.params.get("max_upload_rate"))
+        except ValueError as e:
+            raise SqueezerException(str(e))
+
 
 class PulpEntityAnsibleModule(PulpAnsibleModule):
     def __init__(self, **kwargs):
@@ -116,6 +180,8 @@ class PulpEntityAnsibleModule(PulpAnsibleModule):
             "state": {
                 "choices": ["present", "absent"],
             },
+            "pagination": {"choices": ["offset", "keyset"], "default": "offset"},
+            "pulp_label_select": {},
         }
         argument_spec.update(kwargs.pop("argument_spec", {}))
         super(PulpEntityAnsibleModule, self).__init__(argument_spec=argument_spec, **kwargs)
@@ -193,20 +259,52 @@ class PulpEntity(object):
                 )
             )
 
-    def list(self):
+    def list(self, keyset=False, parameters=None):
         if not hasattr(self, "_list_id"):
             raise SqueezerException("This entity is not enumeratable.")
+        if parameters is None:
+            parameters = {}
+        if "pulp_label_select" in parameters and not self.label_select_supported():
+            raise SqueezerException(
+                "{0} cannot be selected by labels.".format(self._name_plural.capitalize())
+            )
+        if keyset:
+            if keyset_supported(self.module.pulp_api.param_spec(self._list_id, "query")):
+                return self.keyset_list(parameters)
+            self.module.warn(
+                "Keyset pagination is not supported for {0}; falling back to offset.".format(
+                    self._name_plural
+                )
+            )
         entities = []
         offset = 0
         search_result = {"next": True}
         while search_result["next"]:
             search_result = self.module.pulp_api.call(
-                self._list_id, parameters={"limit": PAGE_LIMIT, "offset": offset}
+                self._list_id, parameters=dict(parameters, limit=PAGE_LIMIT, offset=offset)
             )
             entities.extend(search_result["results"])
             offset += PAGE_LIMIT
         return entities
 
+    def label_select_supported(self):
+        return "pulp_label_select" in self.module.pulp_api.param_spec(self._list_id, "query")
+
+    def keyset_list(self, parameters):
+        try:
+            return list(
+                keyset_iterator(
+                    lambda page_parameters: self.module.pulp_api.call(
+                        self._list_id, parameters=page_parameters
+                    ),
+                    parameters,
+                    PAGE_LIMIT,
+                    entities_name=self._name_plural,
+                )
+            )
+        except KeysetError as e:
+            raise SqueezerException(str(e))
+
     def read(self):
         if not hasattr(self, "_read_id"):
             raise SqueezerException("This entity is not readable.")
@@ -308,7 +406,12 @@ class PulpEntity(object):
 
             self.module.set_result(self._name_singular, self.presentation(self.entity))
         else:
-            entities = self.list()
+            parameters = {}
+            if self.module.params["pulp_label_select"] is not None:
+                parameters["pulp_label_select"] = self.module.params["pulp_label_select"]
+            entities = self.list(
+                keyset=self.module.params["pagination"] == "keyset", parameters=parameters
+            )
             self.module.set_result(
                 self._name_plural, [self.presentation(entity) for entity in entities]
             )
@@ -319,6 +422,7 @@ class PulpRepository(PulpEntity):
         repository_version = self.entity["latest_version_href"]
         # In check_mode, assume nothing changed
         if not self.module.check_mode:
+            self.module.record_progress()
             sync_task = self.sync(remote.href, parameters)
 
             if sync_task["created_resources"]:
@@ -381,8 +485,11 @@ class PulpArtifact(PulpEntity):
                 self.entity = self.natural_key
             self.module.set_changed()
             return self.entity
-        with open(filename, "rb") as f:
-            self.uploads["file"] = f.read()
+        self.uploads["file"] = FileSlice(filename)
+        if not self.module.check_mode:
+            rate_limit = self.module.upload_rate_limit()
+            if rate_limit is not None:
+                rate_limit.acquire(size)
         return super(PulpArtifact, self).create()
 
 
@@ -413,16 +520,6 @@ class PulpAccessPolicy(PulpEntity):
     _name_singular = "access_policy"
     _name_plural = "access_policies"
 
-    def find(self):
-        self.entity = next(
-            (
-                entity
-                for entity in self.list()
-                if entity["viewset_name"] == self.natural_key["viewset_name"]
-            ),
-            None,
-        )
-
 
 class PulpTask(PulpEntity):
     _href = "task_href"
@@ -458,9 +555,14 @@ class PulpTask(PulpEntity):
 
     def wait_for(self, desired_state="completed"):
         self.find()
+        for callback in self.module.poll_callbacks:
+            callback(self.entity)
+        intervals = self.module.polling_policy.intervals()
         while self.entity["state"] not in ["completed", "failed", "canceled"]:
-            sleep(2)
+            sleep(next(intervals))
             self.read()
+            for callback in self.module.poll_callbacks:
+                callback(self.entity)
         if self.entity["state"] != desired_state:
             if self.entity["state"] == "failed":
                 raise Exception(
@@ -474,6 +576,7 @@ class PulpTask(PulpEntity):
 
 class PulpUpload(PulpEntity):
     _href = "upload_href"
+    _read_id = "uploads_read"
     _create_id = "uploads_create"
     _update_id = "uploads_update"
     _delete_id = "uploads_delete"
@@ -481,34 +584,65 @@ class PulpUpload(PulpEntity):
 
     @classmethod
     def chunked_upload(cls, module, path, sha256, size):
-        offset = 0
-
+        def _read_upload(upload_href):
+            try:
+                return module.pulp_api.call(cls._read_id, parameters={cls._href: upload_href})
+            except HTTPError:
+                return None
+
+        resumable = None
+        upload_href, acknowledged = None, set()
+        if module.params.get("resume_upload"):
+            resumable = ResumableUpload(module.params["pulp_url"], sha256)
+            upload_href, acknowledged = resumable.resume(CONTENT_CHUNK_SIZE, _read_upload)
         upload = cls(module, natural_key={}, desired_attributes={"size": size})
-        upload.create()
+        if upload_href is None:
+            upload.create()
+            if resumable is not None:
+                resumable.save(upload.href, size, CONTENT_CHUNK_SIZE)
+        else:
+            upload.entity = {"pulp_href": upload_href}
+
+        def _send_chunk(chunk, offset):
+            parameters = dict(upload.primary_key)
+            parameters["Content-Range"] = "bytes {start}-{end}/{size}".format(
+                start=offset,
+                end=offset + len(chunk) - 1,
+                size=size,
+            )
+            module.pulp_api.call(cls._update_id, parameters=parameters, uploads={"file": chunk})
+            if resumable is not None:
+                resumable.acknowledge(offset, len(chunk))
+
         try:
-            with open(path, "rb") as f:
-                for chunk in iter(lambda: f.read(CONTENT_CHUNK_SIZE), b""):
-                    actual_chunk_size = len(chunk)
-                    content_range = "bytes {start}-{end}/{size}".format(
-                        start=offset,
-                        end=offset + actual_chunk_size - 1,
-                        size=size,
-                    )
-                    parameters = upload.primary_key
-                    parameters["Content-Range"] = content_range
-                    uploads = {"file": chunk}
-                    module.pulp_api.call(cls._update_id, parameters=parameters, uploads=uploads)
-                    offset += actual_chunk_size
-
-                response = module.pulp_api.call(
-                    cls._commit_id,
-                    parameters=upload.primary_key,
-                    body={"sha256": sha256},
-                )
-                task = PulpTask(module, {"pulp_href": response["task"]}).wait_for()
+            digest = upload_chunks(
+                path,
+                CONTENT_CHUNK_SIZE,
+                _send_chunk,
+                concurrency=module.params.get("upload_concurrency", 4),
+                retries=module.params.get("upload_retries", 3),
+                acknowledged=acknowledged,
+                rate_limit=module.upload_rate_limit(),
+            )
+        except Exception:
+            if resumable is None:
+                module.pulp_api.call(cls._delete_id, parameters=upload.primary_key)
+            raise
+        try:
+            if digest != sha256:
+                raise SqueezerException("File checksum mismatch.")
+            response = module.pulp_api.call(
+                cls._commit_id,
+                parameters=upload.primary_key,
+                body={"sha256": sha256},
+            )
+            task = PulpTask(module, {"pulp_href": response["task"]}).wait_for()
         except Exception:
             module.pulp_api.call(cls._delete_id, parameters=upload.primary_key)
             raise
+        finally:
+            if resumable is not None:
+                resumable.clear()
 
         artifact_href = task["created_resources"][0]
         return artifact_href
@@ -6,15 +6,50 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 
+import datetime
+import os
+import time
 import traceback
 
 from ansible.module_utils.basic import AnsibleModule, env_fallback, missing_required_lib
+from ansible_collections.pulp.squeezer.plugins.module_utils.digest_cache import DigestCache
+from ansible_collections.pulp.squeezer.plugins.module_utils.keyset import (
+    KEYSET_FIELD,
+    KeysetError,
+    keyset_iterator,
+    keyset_supported,
+)
+from ansible_collections.pulp.squeezer.plugins.module_utils.polling import (
+    PollingPolicy,
+    QueueTimeout,
+    wait_for_queue,
+)
+from ansible_collections.pulp.squeezer.plugins.module_utils.progress import record_progress
+from ansible_collections.pulp.squeezer.plugins.module_utils.resumable import ResumableTask
+from ansible_collections.pulp.squeezer.plugins.module_utils.upload import (
+    AdaptiveChunkSize,
+    chunk_size_from_param,
+    rate_limit_from_param,
+    upload_chunks,
+)
+
+
+def task_group_running(task_group):
+    """
+    Return whether tasks of the task group are still to be dispatched or finished.
+    """
+    # Tasks may still be added to the group until all of them are dispatched.
+    if not task_group.get("all_tasks_dispatched", True):
+        return True
+    return task_group["waiting"] + task_group["running"] + task_group["canceling"] > 0
+
 
 try:
     from packaging.requirements import SpecifierSet
     from pulp_glue.common import __version__ as pulp_glue_version
-    from pulp_glue.common.context import PulpContext, PulpException, PulpNoWait
+    from pulp_glue.common.context import BATCH_SIZE, PulpContext, PulpException, PulpNoWait
     from pulp_glue.common.openapi import BasicAuthProvider
+    from pulp_glue.core.context import PulpArtifactContext, PulpUploadContext
 
     GLUE_VERSION_SPEC = ">=0.29.2,<0.30"
     if not SpecifierSet(GLUE_VERSION_SPEC, prereleases=True).contains(pulp_glue_version):
@@ -23,6 +58,167 @@ try:
         )
 
     PULP_CLI_IMPORT_ERR = None
+
+    class PulpTaskDispatched(PulpNoWait):
+        """
+        Exception to indicate that a task (group) was dispatched without waiting for it.
+
+        Parameters:
+            task: The task entity that was dispatched.
+            task_group: The task group entity that was dispatched.
+        """
+
+        def __init__(self, task=None, task_group=None):
+            self.task = task
+            self.task_group = task_group
+            href = (task or task_group)["pulp_href"]
+            super().__init__(f"Dispatched {href} without waiting.")
+
+    class PulpTaskTimeout(PulpNoWait):
+        """
+        Exception to indicate that a task is still running after the timeout.
+
+        Parameters:
+            task: The last state of the task entity.
+        """
+
+        def __init__(self, task):
+            self.task = task
+            super().__init__(f"Waiting for task {task['pulp_href']} timed out.")
+
+    class SqueezerPulpContext(PulpContext):
+        """
+        PulpContext that polls unfinished tasks according to a `PollingPolicy`.
+
+        Every task or task group read while waiting is passed to the `poll_callbacks`.
+        If `resumable` is set, every task that times out is recorded there, and each call that
+        may dispatch a task re-attaches to a recorded task of the same operation instead, as long
+        as that task is not finished.
+        If `max_queue_depth` is set, the first such call is held back until there are fewer
+        waiting tasks than this multiple of the online workers.
+
+        Parameters:
+            polling_policy: Policy to determine the intervals between polls.
+            resumable: `ResumableTask` to record and resume timed out tasks.
+            max_queue_depth: Number of waiting tasks per online worker to allow before dispatching.
+        """
+
+        def __init__(
+            self, *args, polling_policy=None, resumable=None, max_queue_depth=None, **kwargs
+        ):
+            super().__init__(*args, **kwargs)
+            self.polling_policy = polling_policy or PollingPolicy()
+            self.resumable = resumable
+            self.max_queue_depth = max_queue_depth
+            self.poll_callbacks = []
+            self._dispatching = False
+
+        def call(
+            self, operation_id, non_blocking=False, parameters=None, body=None, validate_body=True
+        ):
+            if self.api.operations[operation_id][0] == "get":
+                return super().call(
+                    operation_id,
+                    non_blocking=non_blocking,
+                    parameters=parameters,
+                    body=body,
+                    validate_body=validate_body,
+                )
+            first_dispatch = not self._dispatching
+            self._dispatching = True
+            try:
+                task = (
+                    None if self.resumable is None else self._resume(self.resumable, operation_id)
+                )
+                if task is not None:
+                    return task if non_blocking else self.wait_for_task(task)
+                if first_dispatch and self.max_queue_depth is not None:
+                    self._wait_for_queue()
+                return super().call(
+                    operation_id,
+                    non_blocking=non_blocking,
+                    parameters=parameters,
+                    body=body,
+                    validate_body=validate_body,
+                )
+            except PulpTaskTimeout as e:
+                if self.resumable is not None:
+                    self.resumable.save(operation_id, e.task["pulp_href"])
+                raise
+
+        def _resume(self, resumable, operation_id):
+            task_href = resumable.pop(operation_id)
+            if task_href is None:
+                return None
+            try:
+                task = super().call("tasks_read", parameters={"task_href": task_href})
+            except PulpException:
+                # The task may have been purged meanwhile.
+                return None
+            # A finished task belongs to an earlier run, so dispatch a new one.
+            if task["state"] not in ["waiting", "running", "canceling"]:
+                return None
+            return task
+
+        def _wait_for_queue(self):
+            try:
+                wait_for_queue(
+                    super().call,
+                    self.max_queue_depth,
+                    self.timeout.total_seconds() if self.timeout else None,
+                )
+            except QueueTimeout as e:
+                raise PulpNoWait(str(e))
+
+        def _polled(self, entity):
+            for callback in self.poll_callbacks:
+                callback(entity)
+
+        def _task_group_finished(self, task_group):
+            if task_group_running(task_group):
+                return False
+            return super()._task_group_finished(task_group)
+
+        def wait_for_task(self, task, expect_cancel=False):
+            deadline = datetime.datetime.now() + self.timeout if self.timeout else None
+
+            if self.background_tasks:
+                raise PulpTaskDispatched(task=task)
+            task_href = task["pulp_href"]
+            intervals = self.polling_policy.intervals()
+            self._polled(task)
+            try:
+                while not self._task_finished(task, expect_cancel=expect_cancel):
+                    if deadline and datetime.datetime.now() > deadline:
+                        raise PulpTaskTimeout(task)
+                    time.sleep(next(intervals))
+                    task = self.api.call("tasks_read", parameters={"task_href": task_href})
+                    self._polled(task)
+                return task
+            except KeyboardInterrupt:
+                raise PulpNoWait(f"Task {task_href} sent to background.")
+
+        def wait_for_task_group(self, task_group):
+            deadline = datetime.datetime.now() + self.timeout if self.timeout else None
+
+            if self.background_tasks:
+                raise PulpTaskDispatched(task_group=task_group)
+            task_group_href = task_group["pulp_href"]
+            intervals = self.polling_policy.intervals()
+            self._polled(task_group)
+            try:
+                while not self._task_group_finished(task_group):
+                    if deadline and datetime.datetime.now() > deadline:
+                        raise PulpNoWait(f"Waiting for task group {task_group_href} timed out.")
+                    time.sleep(next(intervals))
+                    task_group = self.api.call(
+                        "task_groups_read", parameters={"task_group_href": task_group_href}
+                    )
+                    self._polled(task_group)
+                return task_group
+            except KeyboardInterrupt:
+                raise PulpNoWait(f"Task group {task_group_href} sent to background.")
+
 except ImportError:
     PULP_CLI_IMPORT_ERR = traceback.format_exc()
 
@@ -34,6 +230,205 @@ class SqueezerException(Exception):
 __VERSION__ = "0.0.18-dev"
 
 
+def upload_file(
+    pulp_ctx,
+    path,
+    chunk_size,
+    concurrency=4,
+    retries=3,
+    sha256=None,
+    resumable=None,
+    rate_limit=None,
+):
+    """
+    Upload a file in parallel chunks and return the context of the uncommitted upload.
+
+    The digest of the file is computed while uploading and returned alongside.
+    If `sha256` is given, the upload is deleted unless the digest matches.
+    With a `resumable` upload record, a failed upload is kept to be continued by the next call.
+    The caller is expected to clear the record once the upload is committed.
+    A `rate_limit` shared between calls limits their combined upload rate.
+    """
+
+    def _read_upload(upload_href):
+        upload_ctx.pulp_href = upload_href
+        try:
+            return upload_ctx.entity
+        except PulpException:
+            return None
+
+    size = os.path.getsize(path)
+    upload_ctx = PulpUploadContext(pulp_ctx)
+    upload_href, acknowledged = None, set()
+    if resumable is not None:
+        upload_href, acknowledged = resumable.resume(chunk_size, _read_upload)
+    if upload_href is None:
+        upload_href = upload_ctx.create(body={"size": size})["pulp_href"]
+        if resumable is not None:
+            resumable.save(upload_href, size, chunk_size)
+    upload_ctx.pulp_href = upload_href
+
+    def _send_chunk(chunk, offset):
+        upload_ctx.upload_chunk(chunk=chunk, size=size, start=offset)
+        if resumable is not None:
+            resumable.acknowledge(offset, len(chunk))
+
+    try:
+        digest = upload_chunks(
+            path,
+            chunk_size,
+            _send_chunk,
+            concurrency=concurrency,
+            retries=retries,
+            acknowledged=acknowledged,
+            rate_limit=rate_limit,
+        )
+    except Exception:
+        if resumable is None:
+            upload_ctx.delete()
+        raise
+    if sha256 is not None and digest != sha256:
+        upload_ctx.delete()
+        if resumable is not None:
+            resumable.clear()
+        raise SqueezerException("File checksum mismatch.")
+    return upload_ctx, digest
+
+
+def create_pulp_context(params, **kwargs):
+    """
+    Create the context to talk to the pulp server described by the connection parameters.
+
+    Further keyword arguments are passed on to `SqueezerPulpContext`.
+    """
+    auth_args = {}
+    if params["username"]:
+        auth_args["auth_provider"] = BasicAuthProvider(
+            username=params["username"],
+            password=params["password"],
+        )
+    return SqueezerPulpContext(
+        api_root="/pulp/",
+        api_kwargs=dict(
+            base_url=params["pulp_url"],
+            cert=params["user_cert"],
+            key=params["user_key"],
+            validate_certs=params["validate_certs"],
+            refresh_cache=params["refresh_api_cache"],
+            user_agent=f"Squeezer/{__VERSION__}",
+            **auth_args,
+        ),
+        timeout=params["timeout"],
+        **kwargs,
+    )
+
+
+def upload_chunk_size(params):
+    """
+    Return the chunk size to upload files with as selected by the module parameters.
+    """
+    try:
+        chunk_size = chunk_size_from_param(params["chunk_size"])
+    except ValueError as e:
+        raise SqueezerException(str(e))
+    if isinstance(chunk_size, AdaptiveChunkSize) and params.get("resume_upload"):
+        raise SqueezerException("Cannot use 'resume_upload' together with 'chunk_size: auto'.")
+    return chunk_size
+
+
+def upload_rate_limit(params):
+    """
+    Return the rate limit for uploads as selected by the module parameters.
+    """
+    try:
+        return rate_limit_from_param(params["max_upload_rate"])
+    except ValueError as e:
+        raise SqueezerException(str(e))
+
+
+def upload_artifact(
+    pulp_ctx, path, sha256, chunk_size, concurrency=4, retries=3, resumable=None, rate_limit=None
+):
+    """
+    Create an artifact from a file with the given digest and return its href.
+
+    Files larger than `chunk_size` are uploaded in parallel chunks, see `upload_file`.
+    An `AdaptiveChunkSize` is compared by its current size.
+    """
+    size = os.path.getsize(path)
+    if int(chunk_size) > size:
+        if rate_limit is not None:
+            rate_limit.acquire(size)
+        # The server verifies the digest of the file.
+        with open(path, "rb") as file:
+            return PulpArtifactContext(pulp_ctx).create({"sha256": sha256, "file": file})[
+                "pulp_href"
+            ]
+    upload_ctx, _digest = upload_file(
+        pulp_ctx,
+        path,
+        chunk_size,
+        concurrency=concurrency,
+        retries=retries,
+        sha256=sha256,
+        resumable=resumable,
+        rate_limit=rate_limit,
+    )
+    try:
+        task = upload_ctx.commit(sha256)
+    except Exception:
+        upload_ctx.delete()
+        raise
+    finally:
+        if resumable is not None:
+            resumable.clear()
+    return task["created_resources"][0]
+
+
+def list_query_params(context):
+    operation_id = getattr(context, "LIST_ID", None) or context.ID_PREFIX + "_list"
+    return context.pulp_ctx.api.param_spec(operation_id, "query")
+
+
+def parse_datetime(value):
+    """
+    Turn an ISO 8601 timestamp into the datetime pulp-glue expects for date-time parameters.
+
+    pulp-glue sends the datetime as UTC without converting it, so an offset is applied here.
+    """
+    timestamp = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if timestamp.tzinfo is None:
+        return timestamp
+    return timestamp.astimezone(datetime.timezone.utc)
+
+
+def keyset_list_iterator(context, parameters=None, batch_size=None):
+    """
+    List entities ordered by creation time, see `keyset_iterator`.
+    """
+
+    def _list_page(page_parameters):
+        boundary = page_parameters.get(KEYSET_FIELD + "__gte")
+        if boundary is not None:
+            page_parameters = dict(
+                page_parameters, **{KEYSET_FIELD + "__gte": parse_datetime(boundary)}
+            )
+        return context.call("list", parameters=page_parameters)
+
+    payload = dict(parameters or {})
+    payload.update(context.scope)
+    try:
+        for entity in keyset_iterator(
+            _list_page,
+            payload,
+            batch_size or BATCH_SIZE,
+            entities_name=context.ENTITIES,
+        ):
+            yield entity
+    except KeysetError as e:
+        raise SqueezerException(str(e))
+
+
 class PulpAnsibleModule(AnsibleModule):
     def __init__(self, **kwargs):
         argument_spec = {
@@ -53,6 +448,9 @@ class PulpAnsibleModule(AnsibleModule):
             },
             "refresh_api_cache": {"type": "bool", "default": False},
             "timeout": {"type": "int", "default": 10},
+            "task_poll_interval": {"type": "float", "default": 0.05},
+            "task_poll_max_interval": {"type": "float", "default": 2.0},
+            "max_queue_depth": {"type": "float"},
         }
         argument_spec.update(kwargs.pop("argument_spec", {}))
         if not kwargs.pop("no_auth", False):
@@ -78,27 +476,28 @@ class PulpAnsibleModule(AnsibleModule):
             if import_error[1] is not None:
                 self.fail_json(msg=missing_required_lib(import_error[0]), exception=import_error[1])
 
-        auth_args = {}
-        if self.params["username"]:
-            auth_args["auth_provider"] = BasicAuthProvider(
-                username=self.params["username"],
-                password=self.params["password"],
+        try:
+            polling_policy = PollingPolicy(
+                initial_interval=self.params["task_poll_interval"],
+                max_interval=self.params["task_poll_max_interval"],
             )
+        except ValueError as e:
+            self.fail_json(msg=str(e))
+
+        # Only modules that offer not to wait dispatch tasks worth resuming.
+        resumable = None
+        if self.params.get("wait") and not self.check_mode:
+            resumable = ResumableTask(self.params["pulp_url"], self._name, self.params)
 
-        self.pulp_ctx = PulpContext(
-            api_root="/pulp/",
-            api_kwargs=dict(
-                base_url=self.params["pulp_url"],
-                cert=self.params["user_cert"],
-                key=self.params["user_key"],
-                validate_certs=self.params["validate_certs"],
-                refresh_cache=self.params["refresh_api_cache"],
-                user_agent=f"Squeezer/{__VERSION__}",
-                **auth_args,
-            ),
-            background_tasks=False,
-            timeout=self.params["timeout"],
+        self.digest_cache = DigestCache() if self.params.get("digest_cache") else None
+
+        self.pulp_ctx = create_pulp_context(
+            self.params,
+            background_tasks=not self.params.get("wait", True),
             fake_mode=self.check_mode,  # This sets api_kwargs["safe_calls_only"] for us.
+            polling_policy=polling_policy,
+            resumable=resumable,
+            max_queue_depth=self.params.get("max_queue_depth"),
         )
 
     def __enter__(self):
@@ -109,6 +508,8 @@ class PulpAnsibleModule(AnsibleModule):
         return self
 
     def __exit__(self, exc_class, exc_value, tb):
+        if self.digest_cache is not None:
+            self.digest_cache.save()
         if exc_class is None:
             if self._diff_states:
                 self._results["diff"] = {
@@ -117,8 +518,18 @@ class PulpAnsibleModule(AnsibleModule):
                 }
             self.exit_json(changed=self._changed, **self._results)
         else:
+            if issubclass(exc_class, PulpTaskDispatched):
+                if exc_value.task is not None:
+                    self._results["task"] = exc_value.task["pulp_href"]
+                else:
+                    self._results["task_group"] = exc_value.task_group["pulp_href"]
+                self.exit_json(changed=True, **self._results)
+            if issubclass(exc_class, PulpTaskTimeout) and "wait" in self.params:
+                self._results["task"] = exc_value.task["pulp_href"]
+                self._results["still_running"] = True
+                self.fail_json(msg=str(exc_value), changed=True, **self._results)
             if issubclass(exc_class, (PulpException, PulpNoWait, SqueezerException)):
-                self.fail_json(msg=str(exc_value), changed=self._changed)
+                self.fail_json(msg=str(exc_value), changed=self._changed, **self._results)
                 return True
             elif issubclass(exc_class, Exception):
                 self.fail_json(
@@ -137,6 +548,14 @@ class PulpAnsibleModule(AnsibleModule):
     def record_diff_state(self, value):
         self._diff_states.append(value)
 
+    def sha256(self, filename):
+        if self.digest_cache is not None:
+            return self.digest_cache.sha256(filename, super().sha256)
+        return super().sha256(filename)
+
+    def record_progress(self):
+        record_progress(self, self.pulp_ctx.poll_callbacks)
+
 
 class PulpEntityAnsibleModule(PulpAnsibleModule):
     def __init__(self, context_class, entity_singular, entity_plural, **kwargs):
@@ -144,6 +563,9 @@ class PulpEntityAnsibleModule(PulpAnsibleModule):
             "state": {
                 "choices": ["present", "absent"],
             },
+            "count_only": {"type": "bool", "default": False},
+            "pagination": {"choices": ["offset", "keyset"], "default": "offset"},
+            "pulp_label_select": {},
         }
         argument_spec.update(kwargs.pop("argument_spec", {}))
         super().__init__(argument_spec=argument_spec, **kwargs)
@@ -162,6 +584,8 @@ class PulpEntityAnsibleModule(PulpAnsibleModule):
     def process(self, natural_key, desired_attributes, defaults=None):
         if self.state is None:
             return self.process_info(natural_key, desired_attributes)
+        if self.params["count_only"]:
+            raise SqueezerException("Cannot use 'count_only' together with 'state'.")
 
         if "pulp_href" in natural_key:
             self.context.pulp_href = natural_key["pulp_href"]
@@ -194,11 +618,13 @@ class PulpEntityAnsibleModule(PulpAnsibleModule):
     def process_info(self, natural_key, desired_attributes):
         if any((value is not None for value in desired_attributes.values())):
             raise SqueezerException("Cannot use attributes when querying entities.")
-        # TODO turn this into a filtering query instead
+        if self.params["count_only"]:
+            self.set_result("count", self.count(natural_key))
+            return
         if None in natural_key.values():
             entities = [
                 self.represent(entity)
-                for entity in self.context.list(limit=-1, offset=0, parameters={})
+                for entity in self.list_entities(parameters=self.list_parameters())
             ]
             self.set_result(self.entity_plural, entities)
         else:
@@ -208,6 +634,36 @@ class PulpEntityAnsibleModule(PulpAnsibleModule):
                 self.context.entity = natural_key
             self.set_result(self.entity_singular, self.represent(self.context.entity))
 
+    def list_parameters(self):
+        parameters = {}
+        if self.params["pulp_label_select"] is not None:
+            if "pulp_label_select" not in list_query_params(self.context):
+                raise SqueezerException(
+                    f"{self.entity_plural.capitalize()} cannot be selected by labels."
+                )
+            parameters["pulp_label_select"] = self.params["pulp_label_select"]
+        return parameters
+
+    def list_entities(self, parameters):
+        if self.params["pagination"] == "keyset":
+            if keyset_supported(list_query_params(self.context)):
+                return keyset_list_iterator(self.context, parameters)
+            self.warn(
+                f"Keyset pagination is not supported for {self.entity_plural};"
+                " falling back to offset."
+            )
+        return self.context.list(limit=-1, offset=0, parameters=parameters)
+
+    def count(self, natural_key):
+        # Let the server do the counting and only transfer a single entity.
+        parameters = self.list_parameters()
+        parameters.update({key: value for key, value in natural_key.items() if value is not None})
+        if "pulp_href" in parameters:
+            parameters["pulp_href__in"] = [parameters.pop("pulp_href")]
+        parameters.update(self.context.scope)
+        parameters.update({"limit": 1, "offset": 0})
+        return self.context.call("list", parameters=parameters)["count"]
+
     def process_special(self, entity, natural_key, desired_attributes, defaults=None):
         raise SqueezerException(f"Invalid state '{self.state}'.")
 
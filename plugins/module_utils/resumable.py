@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+# copyright (c) 2024, Matthias Dellweg
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from ansible_collections.pulp.squeezer.plugins.module_utils.cache import cache_dir
+
+# Parameters that do not change what a module dispatches.
+VOLATILE_PARAMS = [
+    "username",
+    "password",
+    "user_cert",
+    "user_key",
+    "validate_certs",
+    "refresh_api_cache",
+    "timeout",
+    "task_poll_interval",
+    "task_poll_max_interval",
+    "wait",
+    "max_queue_depth",
+    "progress_file",
+    "progress_journal",
+    "progress_interval",
+]
+
+
+class ResumableTask(object):
+    """
+    Remember the tasks that outlived the module, so the next invocation can re-attach to them.
+
+    The tasks are stored in the squeezer cache directory under a key derived from the module name
+    and its parameters, so only an invocation with the same parameters picks them up again.
+    """
+
+    def __init__(self, base_url, module_name, params):
+        key_data = {key: value for key, value in params.items() if key not in VOLATILE_PARAMS}
+        key_data["_module"] = module_name
+        key = hashlib.sha256(json.dumps(key_data, sort_keys=True, default=str).encode()).hexdigest()
+        self.path = _cache_path(base_url, "tasks", key + ".json")
+
+    def load(self):
+        records = _load(self.path)
+        # Older versions recorded a single task.
+        if isinstance(records, dict):
+            records = [records]
+        return records or []
+
+    def save(self, operation_id, task_href):
+        _save(self.path, self.load() + [{"operation_id": operation_id, "task": task_href}])
+
+    def pop(self, operation_id):
+        """
+        Forget the first task recorded for `operation_id` and return its href.
+        """
+        records = self.load()
+        for index, record in enumerate(records):
+            if record["operation_id"] == operation_id:
+                del records[index]
+                if records:
+                    _save(self.path, records)
+                else:
+                    self.clear()
+                return record["task"]
+        return None
+
+    def clear(self):
+        _clear(self.path)
+
+
+class ResumableUpload(object):
+    """
+    Remember an uncommitted upload of a file, so a failed upload can be continued later.
+
+    The upload is stored in the squeezer cache directory under the digest of the file, together
+    with the chunks acknowledged by the server.
+    """
+
+    def __init__(self, base_url, sha256):
+        self.path = _cache_path(base_url, "uploads", sha256 + ".json")
+        self._record = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        return _load(self.path)
+
+    def save(self, upload_href, size, chunk_size):
+        self._record = {"upload": upload_href, "size": size, "chunk_size": chunk_size, "ranges": []}
+        _save(self.path, self._record)
+
+    def resume(self, chunk_size, read_upload):
+        """
+        Return the href of the recorded upload and the offsets of the chunks stored with it.
+
+        `read_upload(upload_href)` returns the upload from the server or None if it is gone.
+        The chunks reported by the server take precedence over the ones recorded locally.
+        """
+        record = self.load()
+        if record is None:
+            return None, set()
+        upload = None
+        if record["chunk_size"] == chunk_size:
+            upload = read_upload(record["upload"])
+        if upload is None or upload.get("completed"):
+            self.clear()
+            return None, set()
+        self._record = record
+        chunks = upload.get("chunks")
+        if chunks is not None:
+            ranges = [(chunk["offset"], chunk["size"]) for chunk in chunks]
+        else:
+            ranges = record["ranges"]
+        size = record["size"]
+        return record["upload"], {
+            offset
+            for offset, length in ranges
+            if offset % chunk_size == 0 and length == min(chunk_size, size - offset)
+        }
+
+    def acknowledge(self, offset, length):
+        """
+        Record that the chunk at `offset` was stored by the server. This is safe to call from
+        several threads.
+        """
+        with self._lock:
+            self._record["ranges"].append([offset, length])
+            _save(self.path, self._record)
+
+    def clear(self):
+        _clear(self.path)
+
+
+def _cache_path(base_url, *parts):
+    return cache_dir(base_url.replace(":", "_").replace("/", "_"), *parts)
+
+
+def _load(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def _save(path, data):
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    fd, tmp_path = tempfile.mkstemp(dir=directory)
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f)
+    os.rename(tmp_path, path)
+
+
+def _clear(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
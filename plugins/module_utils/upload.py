@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+
+# copyright (c) 2024, Matthias Dellweg
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ansible.module_utils.common.text.formatters import human_to_bytes
+from ansible_collections.pulp.squeezer.plugins.module_utils.polling import PollingPolicy
+from ansible_collections.pulp.squeezer.plugins.module_utils.resumable import ResumableUpload
+from ansible_collections.pulp.squeezer.plugins.module_utils.upload_lock import UploadLock
+
+MIB = 1024 * 1024
+
+# Options of the modules uploading files, see the upload documentation fragment.
+UPLOAD_ARGUMENT_SPEC = {
+    "chunk_size": {"type": "raw", "default": 33554432},
+    "upload_concurrency": {"type": "int", "default": 4},
+    "upload_retries": {"type": "int", "default": 3},
+    "digest_cache": {"type": "bool", "default": False},
+    "resume_upload": {"type": "bool", "default": False},
+    "max_upload_rate": {},
+    "upload_lock": {"type": "bool", "default": False},
+    "upload_lock_dir": {"type": "path"},
+}
+
+
+class AdaptiveChunkSize(object):
+    """
+    Chunk size that follows the throughput measured while uploading.
+
+    After every chunk, the size moves towards what is sent in `target_seconds` at the measured
+    rate, by at most a factor of two and within `min_size` and `max_size`. A failed chunk halves
+    the size. The sizes used are kept in `history`. `int()` gives the current size.
+    """
+
+    def __init__(self, initial=8 * MIB, min_size=1 * MIB, max_size=64 * MIB, target_seconds=5.0):
+        self.size = initial
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_seconds = target_seconds
+        self.history = []
+        self._lock = threading.Lock()
+
+    def __int__(self):
+        return self.size
+
+    def next_size(self):
+        with self._lock:
+            if not self.history or self.history[-1] != self.size:
+                self.history.append(self.size)
+            return self.size
+
+    def record(self, length, seconds):
+        if length < self.min_size:
+            # The last chunk of a file says little about the throughput.
+            return
+        ideal = length / max(seconds, 0.001) * self.target_seconds
+        with self._lock:
+            size = min(max(ideal, self.size / 2), self.size * 2)
+            # Whole MiB keep the chunks aligned in memory and readable in the results.
+            size = int(size // MIB * MIB)
+            self.size = min(max(size, self.min_size), self.max_size)
+
+    def failed(self):
+        with self._lock:
+            self.size = max(self.size // 2 // MIB * MIB, self.min_size)
+
+
+class RateLimit(object):
+    """
+    Token bucket limiting the bytes sent per second, shared by all threads uploading.
+
+    Up to `burst` bytes, one second worth by default, may be sent at once. Larger amounts are
+    granted on credit, and the caller waits until it is paid back.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or rate
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate
+        if wait > 0:
+            time.sleep(wait)
+
+
+def file_sha256(path):
+    """
+    Return the sha256 hex digest of the file at `path`.
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(MIB), b""):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def lookup_sha256(path, sha256=None, digest_cache=None):
+    """
+    Return the digest to look up the file at `path` on the server by.
+
+    A given `sha256` is used as is, since it is verified while uploading. Otherwise the file is
+    read once more just for this, through `digest_cache` if given.
+    """
+    if sha256 is not None:
+        return sha256
+    if digest_cache is not None:
+        return digest_cache.sha256(path, file_sha256)
+    return file_sha256(path)
+
+
+def rate_limit_from_param(value):
+    """
+    Turn the value of a max_upload_rate option into a `RateLimit`, or None if it is not set.
+    """
+    if value is None:
+        return None
+    rate = human_to_bytes(value)
+    if rate <= 0:
+        raise ValueError("max_upload_rate must be positive.")
+    return RateLimit(rate)
+
+
+def chunk_size_from_param(value):
+    """
+    Turn the value of a chunk_size option into a number of bytes or an `AdaptiveChunkSize`.
+    """
+    if value == "auto":
+        return AdaptiveChunkSize()
+    try:
+        chunk_size = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("chunk_size must be a number of bytes or 'auto'.")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive.")
+    return chunk_size
+
+
+def upload_options(params, sha256, chunk_size, rate_limit, check_mode=False):
+    """
+    Return how to upload the file with the digest `sha256` as selected by the parameters of
+    `UPLOAD_ARGUMENT_SPEC` and `pulp_url`.
+
+    `chunk_size` and `rate_limit` are shared by all uploads of a task.
+    Without a digest, an upload can be neither resumed nor locked.
+    """
+    return {
+        "chunk_size": chunk_size,
+        "rate_limit": rate_limit,
+        "upload_concurrency": params["upload_concurrency"],
+        "upload_retries": params["upload_retries"],
+        "resumable": (
+            ResumableUpload(params["pulp_url"], sha256)
+            if params["resume_upload"] and sha256 is not None
+            else None
+        ),
+        "upload_lock": (
+            UploadLock(params["upload_lock_dir"], sha256)
+            if params["upload_lock"] and sha256 is not None and not check_mode
+            else None
+        ),
+    }
+
+
+def locked_upload(upload_lock, find, upload):
+    """
+    Return the result of `upload()` and True, holding `upload_lock` if given.
+
+    Another host may have uploaded the file while waiting for the lock. If `find()` then returns
+    a result, it is returned with False instead.
+    """
+    if upload_lock is None:
+        return upload(), True
+    with upload_lock:
+        found = find()
+        if found is not None:
+            return found, False
+        return upload(), True
+
+
+def upload_chunks(
+    path, chunk_size, send_chunk, concurrency=4, retries=3, acknowledged=(), rate_limit=None
+):
+    """
+    Upload a file in chunks of `chunk_size` with up to `concurrency` chunks in flight.
+
+    The file is read once front to back, and its sha256 digest is computed on the way, so at
+    most `concurrency` chunks are held in memory. `send_chunk(chunk, offset)` is retried up to
+    `retries` times with increasing pauses before the failure is raised. All chunks are
+    acknowledged when this function returns the hex digest of the file.
+
+    Chunks starting at an offset in `acknowledged` are already stored on the server. They are
+    only read to compute the digest.
+    `chunk_size` may be an `AdaptiveChunkSize` to adapt the size of the chunks while uploading.
+    Every chunk sent, including retries, is accounted for in `rate_limit` if given.
+    """
+    adaptive = chunk_size if isinstance(chunk_size, AdaptiveChunkSize) else None
+
+    def _send(chunk, offset):
+        intervals = PollingPolicy(initial_interval=0.5, max_interval=10.0).intervals()
+        for attempt in range(retries + 1):
+            if rate_limit is not None:
+                rate_limit.acquire(len(chunk))
+            # Time spent waiting for the rate limit says nothing about the throughput.
+            start = time.time()
+            try:
+                send_chunk(chunk, offset)
+                if adaptive is not None:
+                    adaptive.record(len(chunk), time.time() - start)
+                return
+            except Exception:
+                if adaptive is not None:
+                    adaptive.failed()
+                if attempt == retries:
+                    raise
+                time.sleep(next(intervals))
+
+    def _done(future):
+        if not future.cancelled() and future.exception() is not None:
+            failures.append(future.exception())
+        slots.release()
+
+    sha256 = hashlib.sha256()
+    slots = threading.BoundedSemaphore(concurrency)
+    failures = []
+    futures = []
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        try:
+            with open(path, "rb") as f:
+                offset = 0
+                read_size = adaptive.next_size if adaptive is not None else lambda: chunk_size
+                for chunk in iter(lambda: f.read(read_size()), b""):
+                    sha256.update(chunk)
+                    if offset in acknowledged:
+                        offset += len(chunk)
+                        continue
+                    slots.acquire()
+                    if failures:
+                        raise failures[0]
+                    future = executor.submit(_send, chunk, offset)
+                    future.add_done_callback(_done)
+                    futures.append(future)
+                    offset += len(chunk)
+            for future in futures:
+                future.result()
+        except Exception:
+            # Do not send the pending chunks. shutdown(cancel_futures=True) needs Python 3.9.
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+            raise
+    return sha256.hexdigest()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+# copyright (c) 2024, Matthias Dellweg
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import fcntl
+import os
+
+from ansible_collections.pulp.squeezer.plugins.module_utils.cache import cache_dir
+
+
+class UploadLock(object):
+    """
+    Exclusive lock on uploading the file with a given digest.
+
+    The lock is a POSIX record lock on a file in `directory`, so it is shared by all processes
+    using the same directory, including other hosts on a network file system. It is released
+    when the process holding it ends, so an aborted upload never blocks the others.
+    """
+
+    def __init__(self, directory, sha256):
+        if directory is None:
+            directory = cache_dir("locks")
+        self.path = os.path.join(directory, sha256 + ".lock")
+        self._file = None
+
+    def __enter__(self):
+        directory = os.path.dirname(self.path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._file = open(self.path, "a")
+        try:
+            fcntl.lockf(self._file, fcntl.LOCK_EX)
+        except Exception:
+            self._file.close()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        try:
+            fcntl.lockf(self._file, fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
@@ -63,8 +63,66 @@ options:
         required: false
         type: list
         elements: str
+  access_policies:
+    description:
+      - List of access policies to converge at once.
+      - All current access policies are fetched in a single pass and only those that differ are updated.
+      - Mutually exclusive with I(viewset_name), I(statements) and I(creation_hooks).
+    type: list
+    elements: dict
+    suboptions:
+      viewset_name:
+        description: Name of the viewset the access policy is attatched to
+        required: true
+        type: str
+      statements:
+        description: Statements to controll access to certain actions
+        type: list
+        elements: dict
+        suboptions:
+          action:
+            description: Names of actions on the viewset
+            required: true
+            type: list
+            elements: str
+          principal:
+            description: Description of the actor
+            required: true
+            type: str
+          condition:
+            description:
+              - Condition as a string or a list
+              - If a list is provided, all conditions are composed with and
+            type: raw
+          effect:
+            description: Effect of the statement
+            required: true
+            choices:
+              - allow
+              - deny
+            type: str
+      creation_hooks:
+        description: Hooks to be called on object creation
+        type: list
+        elements: dict
+        suboptions:
+          function:
+            description: Function to call
+            required: true
+            type: str
+          parameters:
+            description: Parameters for the function call
+            required: true
+            type: raw
+          permissions:
+            description: List of permissions to assign to a principal
+            required: false
+            type: list
+            elements: str
 extends_documentation_fragment:
   - pulp.squeezer.pulp.readonly_entity_state
+  - pulp.squeezer.pulp.entity_info
+  - pulp.squeezer.pulp.entity_list
   - pulp.squeezer.pulp.glue
   - pulp.squeezer.pulp
 author:
@@ -104,13 +162,31 @@ EXAMPLES = r"""
         principal: "*"
         effect: "allow"
     state: present
+
+- name: Modify multiple access policies at once
+  pulp.squeezer.access_policy:
+    pulp_url: https://pulp.example.org
+    username: admin
+    password: password
+    access_policies:
+      - viewset_name: "tasks"
+        statements:
+          - action: "*"
+            principal: "*"
+            effect: "allow"
+      - viewset_name: "repositories/file/file"
+        statements:
+          - action: "*"
+            principal: "admin"
+            effect: "allow"
+    state: present
 """
 
 RETURN = r"""
   access_policies:
     description: List of access policies
     type: list
-    returned: when no viewset_name is given
+    returned: when no viewset_name is given or access_policies is used
   remote:
     description: Access policy details
     type: dict
@@ -120,7 +196,10 @@ RETURN = r"""
 
 import traceback
 
-from ansible_collections.pulp.squeezer.plugins.module_utils.pulp_glue import PulpEntityAnsibleModule
+from ansible_collections.pulp.squeezer.plugins.module_utils.pulp_glue import (
+    PulpEntityAnsibleModule,
+    SqueezerException,
+)
 
 try:
     from pulp_glue.core.context import PulpAccessPolicyContext
@@ -131,50 +210,116 @@ except ImportError:
     PulpAccessPolicyContext = None
 
 
+STATEMENTS_SPEC = {
+    "type": "list",
+    "elements": "dict",
+    "options": {
+        "action": {"required": True, "type": "list", "elements": "str"},
+        "principal": {"required": True},
+        "condition": {"type": "raw"},
+        "effect": {"required": True, "choices": ["allow", "deny"]},
+    },
+}
+CREATION_HOOKS_SPEC = {
+    "type": "list",
+    "elements": "dict",
+    "options": {
+        "function": {"required": True},
+        "parameters": {"required": True, "type": "raw"},
+        "permissions": {"type": "list", "elements": "str"},
+    },
+}
+
+
+def desired_policy_attributes(params):
+    desired_attributes = {
+        key: params[key] for key in ["statements", "creation_hooks"] if params[key] is not None
+    }
+    if "statements" in desired_attributes:
+        for statement in desired_attributes["statements"]:
+            if statement["condition"] is None:
+                del statement["condition"]
+    return desired_attributes
+
+
+class PulpAccessPolicyAnsibleModule(PulpEntityAnsibleModule):
+    def process_bulk(self, access_policies):
+        current_policies = {
+            entity["viewset_name"]: entity
+            for entity in self.context.list(limit=-1, offset=0, parameters={})
+        }
+        before = []
+        after = []
+        results = []
+        for access_policy in access_policies:
+            viewset_name = access_policy["viewset_name"]
+            if viewset_name not in current_policies:
+                raise SqueezerException(
+                    f"Could not find access policy for viewset '{viewset_name}'."
+                )
+            entity = current_policies[viewset_name]
+            desired_attributes = self.context.preprocess_entity(
+                desired_policy_attributes(access_policy), partial=True
+            )
+            changes = {
+                key: value for key, value in desired_attributes.items() if entity.get(key) != value
+            }
+            if changes:
+                if self.check_mode:
+                    updated_entity = dict(entity, **changes)
+                else:
+                    updated_entity = self.context.call(
+                        "partial_update",
+                        parameters={self.context.HREF: entity["pulp_href"]},
+                        body=changes,
+                    )
+                self.set_changed()
+                before.append(self.represent(entity))
+                after.append(self.represent(updated_entity))
+                entity = updated_entity
+            results.append(self.represent(entity))
+        if before:
+            self.record_diff_state(before)
+            self.record_diff_state(after)
+        self.set_result(self.entity_plural, results)
+
+
 def main():
-    with PulpEntityAnsibleModule(
+    with PulpAccessPolicyAnsibleModule(
         context_class=PulpAccessPolicyContext,
         entity_singular="access_policy",
         entity_plural="access_policies",
         import_errors=[("pulp-glue", PULP_CLI_IMPORT_ERR)],
         argument_spec={
             "viewset_name": {},
-            "statements": {
+            "statements": STATEMENTS_SPEC,
+            "creation_hooks": dict(CREATION_HOOKS_SPEC, aliases=["permissions_assignment"]),
+            "access_policies": {
                 "type": "list",
                 "elements": "dict",
                 "options": {
-                    "action": {"required": True, "type": "list", "elements": "str"},
-                    "principal": {"required": True},
-                    "condition": {"type": "raw"},
-                    "effect": {"required": True, "choices": ["allow", "deny"]},
+                    "viewset_name": {"required": True},
+                    "statements": STATEMENTS_SPEC,
+                    "creation_hooks": CREATION_HOOKS_SPEC,
                 },
             },
-            "creation_hooks": {
-                "type": "list",
-                "elements": "dict",
-                "options": {
-                    "function": {"required": True},
-                    "parameters": {"required": True, "type": "raw"},
-                    "permissions": {"type": "list", "elements": "str"},
-                },
-                "aliases": ["permissions_assignment"],
-            },
             "state": {"choices": ["present"]},
         },
-        required_if=[("state", "present", ["viewset_name"])],
+        required_if=[("state", "present", ["viewset_name", "access_policies"], True)],
+        required_by={"access_policies": ["state"]},
+        mutually_exclusive=[
+            ("access_policies", "viewset_name"),
+            ("access_policies", "statements"),
+            ("access_policies", "creation_hooks"),
+        ],
     ) as module:
-        natural_key = {"viewset_name": module.params["viewset_name"]}
-        desired_attributes = {
-            key: module.params[key]
-            for key in ["statements", "creation_hooks"]
-            if module.params[key] is not None
-        }
-        if "statements" in desired_attributes:
-            for statement in desired_attributes["statements"]:
-                if statement["condition"] is None:
-                    del statement["condition"]
+        if module.params["access_policies"] is not None:
+            module.process_bulk(module.params["access_policies"])
+        else:
+            natural_key = {"viewset_name": module.params["viewset_name"]}
+            desired_attributes = desired_policy_attributes(module.params)
 
-        module.process(natural_key, desired_attributes)
+            module.process(natural_key, desired_attributes)
 
 
 if __name__ == "__main__":
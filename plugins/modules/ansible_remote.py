@@ -51,6 +51,8 @@ options:
 extends_documentation_fragment:
   - pulp.squeezer.pulp.remote
   - pulp.squeezer.pulp.entity_state
+  - pulp.squeezer.pulp.entity_info
+  - pulp.squeezer.pulp.entity_list
   - pulp.squeezer.pulp.glue
   - pulp.squeezer.pulp
 author:
@@ -33,6 +33,8 @@ options:
   timeout:
     default: 3600
 extends_documentation_fragment:
+  - pulp.squeezer.pulp.progress
+  - pulp.squeezer.pulp.task
   - pulp.squeezer.pulp.glue
   - pulp.squeezer.pulp
 author:
@@ -58,6 +60,20 @@ RETURN = r"""
     description: Repository version after synching
     type: dict
     returned: always
+  task:
+    description: Href of the dispatched task
+    type: str
+    returned: when I(wait) is false and a task was dispatched or when waiting for the task timed out
+  still_running:
+    description: Whether the module timed out while the task it waits for is still running
+    type: bool
+    returned: when waiting for the task timed out
+  progress:
+    description:
+      - Time series of up to 20 progress snapshots taken while waiting for the task.
+      - Each snapshot holds the C(done) counter of every progress report and its rate per second since the previous snapshot.
+    type: list
+    returned: when a task was waited for
 """
 
 
@@ -88,6 +104,10 @@ def main():
             "remote": {"required": False},
             "repository": {"required": True},
             "timeout": {"type": "int", "default": 3600},
+            "wait": {"type": "bool", "default": True},
+            "progress_file": {"type": "path"},
+            "progress_journal": {"type": "bool", "default": False},
+            "progress_interval": {"type": "float", "default": 10},
         },
     ) as module:
         if module.params["content_type"] == "collection":
@@ -114,6 +134,7 @@ def main():
         repository_version = repository["latest_version_href"]
         # In check_mode, assume nothing changed
         if not module.check_mode:
+            module.record_progress()
             sync_task = repository_ctx.sync(body=payload)
 
             if sync_task["created_resources"]:
@@ -23,6 +23,12 @@ options:
     description: "JSON representation of the body to send in the request (only POST, PUT and PATCH requests.)"
     type: dict
     required: false
+  count_only:
+    description:
+      - Only report the number of entities a list operation would return in C(count).
+      - The query is issued with C(limit=1) and can be combined with filters in I(parameters).
+    type: bool
+    default: false
 extends_documentation_fragment:
   - pulp.squeezer.pulp.glue
   - pulp.squeezer.pulp
@@ -40,17 +46,35 @@ EXAMPLES = r"""
 - name: Report pulp status
   debug:
     var: pulp_result.response
+
+- name: Count rpm repositories
+  pulp.squeezer.api_call:
+    pulp_url: https://pulp.example.org
+    username: admin
+    password: password
+    operation_id: repositories_rpm_rpm_list
+    parameters:
+      name__startswith: "el9-"
+    count_only: true
+  register: pulp_result
 """
 
 RETURN = r"""
   response:
     description: Pulp api response
     type: dict
-    returned: always
+    returned: unless count_only is set
+  count:
+    description: Number of entities matching the list operation
+    type: int
+    returned: when count_only is set
 """
 
 
-from ansible_collections.pulp.squeezer.plugins.module_utils.pulp_glue import PulpAnsibleModule
+from ansible_collections.pulp.squeezer.plugins.module_utils.pulp_glue import (
+    PulpAnsibleModule,
+    SqueezerException,
+)
 
 try:
     from pulp_glue.common.context import NotImplementedFake
@@ -64,19 +88,29 @@ def main():
             "operation_id": {"required": True},
             "parameters": {"type": "dict"},
             "body": {"type": "dict"},
+            "count_only": {"type": "bool", "default": False},
         },
     ) as module:
         operation_id = module.params["operation_id"]
         parameters = module.params["parameters"]
         body = module.params["body"]
-        if module.pulp_ctx.api.operations[operation_id][0].upper() not in ["GET", "HEAD"]:
-            module.set_changed()
-        try:
-            response = module.pulp_ctx.call(operation_id, parameters=parameters, body=body)
-        except NotImplementedFake:
-            if module.check_mode:
-                response = None
-        module.set_result("response", response)
+        if module.params["count_only"]:
+            if body is not None:
+                raise SqueezerException("Cannot use 'body' together with 'count_only'.")
+            if "limit" not in module.pulp_ctx.api.param_spec(operation_id, "query"):
+                raise SqueezerException(f"Operation '{operation_id}' is not a list operation.")
+            parameters = dict(parameters or {}, limit=1, offset=0)
+            response = module.pulp_ctx.call(operation_id, parameters=parameters)
+            module.set_result("count", response["count"])
+        else:
+            if module.pulp_ctx.api.operations[operation_id][0].upper() not in ["GET", "HEAD"]:
+                module.set_changed()
+            try:
+                response = module.pulp_ctx.call(operation_id, parameters=parameters, body=body)
+            except NotImplementedFake:
+                if module.check_mode:
+                    response = None
+            module.set_result("response", response)
 
 
 if __name__ == "__main__":
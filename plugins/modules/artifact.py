@@ -19,14 +19,30 @@ options:
     description:
       - sha256 digest of the artifact to query or delete.
       - When specified together with file, it will be used to verify any transaction.
+        The file is then read only once, while it is uploaded.
+      - When specified without file, the artifact must already exist to be C(present).
     type: str
+  remote_src:
+    description:
+      - Whether C(file) is on the managed node.
+      - If C(false), C(file) is searched for on the controller like the source of M(ansible.builtin.copy). The controller
+        uploads it straight to the pulp server while hashing it, and the module only gets to see the resulting artifact.
+        Connection parameters not given to the task are taken from the C(SQUEEZER_*) environment variables of the controller.
+      - For other states than C(present), the controller only computes the digest of C(file) and the module gets that instead.
+    type: bool
+    default: true
   chunk_size:
     description:
       - Size of the chunks to upload a file.
-    type: int
+      - C(auto) adapts the size to the throughput measured while uploading, starting at 8 MiB and staying between 1 MiB and 64 MiB.
+        The sizes used are returned as C(chunk_sizes).
+    type: raw
     default: 33554432
 extends_documentation_fragment:
   - pulp.squeezer.pulp.entity_state
+  - pulp.squeezer.pulp.entity_info
+  - pulp.squeezer.pulp.entity_list
+  - pulp.squeezer.pulp.upload
   - pulp.squeezer.pulp.glue
   - pulp.squeezer.pulp
 author:
@@ -52,6 +68,15 @@ EXAMPLES = r"""
     file: local_artifact.txt
     state: present
 
+- name: Upload a file from the controller
+  pulp.squeezer.artifact:
+    pulp_url: https://pulp.example.org
+    username: admin
+    password: password
+    file: local_artifact.txt
+    remote_src: false
+    state: present
+
 - name: Delete an artifact by specifying a file
   pulp.squeezer.artifact:
     pulp_url: https://pulp.example.org
@@ -78,6 +103,10 @@ RETURN = r"""
     description: Artifact details
     type: dict
     returned: when file or sha256 is given
+  chunk_sizes:
+    description: Sizes of the chunks used in the order they were chosen
+    type: list
+    returned: when chunk_size is auto
 """
 
 import os
@@ -86,6 +115,17 @@ import traceback
 from ansible_collections.pulp.squeezer.plugins.module_utils.pulp_glue import (
     PulpEntityAnsibleModule,
     SqueezerException,
+    upload_artifact,
+    upload_chunk_size,
+    upload_rate_limit,
+)
+from ansible_collections.pulp.squeezer.plugins.module_utils.upload import (
+    UPLOAD_ARGUMENT_SPEC,
+    AdaptiveChunkSize,
+    file_sha256,
+    locked_upload,
+    lookup_sha256,
+    upload_options,
 )
 
 try:
@@ -123,15 +163,45 @@ try:
             else:
                 if entity is None:
                     # This is being quite different:
-                    with open(defaults["file"], "rb") as file:
-                        self.upload(
-                            file=file,
-                            chunk_size=defaults["chunk_size"],
-                            sha256=self._entity_lookup["sha256"],
+                    sha256 = self._entity_lookup["sha256"]
+                    if defaults["file"] is None:
+                        raise SqueezerException(
+                            "Artifact not found. A file is needed to create it."
                         )
+                    if self.pulp_ctx.fake_mode:
+                        # Nothing is sent to the server to verify the digest in check mode.
+                        if file_sha256(defaults["file"]) != sha256:
+                            raise SqueezerException("File digest does not match.")
+                        size = os.path.getsize(defaults["file"])
+                        return True, None, {"sha256": sha256, "size": size}
+                    entity, uploaded = locked_upload(
+                        defaults["upload_lock"],
+                        self._find,
+                        lambda: self._upload(sha256, defaults),
+                    )
+                    if not uploaded:
+                        return False, entity, entity
                     return True, None, self.entity
             return False, entity, entity
 
+        def _find(self):
+            try:
+                return self.entity
+            except PulpEntityNotFound:
+                return None
+
+        def _upload(self, sha256, defaults):
+            self.pulp_href = upload_artifact(
+                self.pulp_ctx,
+                defaults["file"],
+                sha256,
+                defaults["chunk_size"],
+                concurrency=defaults["upload_concurrency"],
+                retries=defaults["upload_retries"],
+                resumable=defaults["resumable"],
+                rate_limit=defaults["rate_limit"],
+            )
+
 except ImportError:
     PULP_CLI_IMPORT_ERR = traceback.format_exc()
     PulpArtifactContext = None
@@ -145,21 +215,18 @@ def main():
         import_errors=[("pulp-glue", PULP_CLI_IMPORT_ERR)],
         argument_spec={
             "file": {"type": "path"},
+            "remote_src": {"type": "bool", "default": True},
             "sha256": {},
-            "chunk_size": {"type": "int", "default": 33554432},
+            **UPLOAD_ARGUMENT_SPEC,
         },
-        required_if=[("state", "present", ["file"])],
+        required_if=[("state", "present", ["file", "sha256"], True)],
     ) as module:
         sha256 = module.params["sha256"]
+        chunk_size = upload_chunk_size(module.params)
         if module.params["file"]:
             if not os.path.exists(module.params["file"]):
                 raise SqueezerException("File not found.")
-            file_sha256 = module.sha256(module.params["file"])
-            if sha256:
-                if sha256 != file_sha256:
-                    raise SqueezerException("File checksum mismatch.")
-            else:
-                sha256 = file_sha256
+            sha256 = lookup_sha256(module.params["file"], sha256, module.digest_cache)
 
         if sha256 is None and module.state == "absent":
             raise SqueezerException(
@@ -172,10 +239,12 @@ def main():
         desired_attributes = {}
         defaults = {
             "file": module.params["file"],
-            "chunk_size": module.params["chunk_size"],
+            **upload_options(module.params, sha256, chunk_size, upload_rate_limit(module.params)),
         }
 
         module.process(natural_key, desired_attributes, defaults=defaults)
+        if isinstance(chunk_size, AdaptiveChunkSize):
+            module.set_result("chunk_sizes", chunk_size.history)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,247 @@
+#!/usr/bin/python
+
+# copyright (c) 2024, Matthias Dellweg
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+DOCUMENTATION = r"""
+---
+module: artifacts
+short_description: Upload many files as artifacts to a pulp api server instance
+description:
+  - "This makes sure that a set of local files is present as artifacts in a pulp api server instance."
+  - "The files are hashed in parallel, their existence is checked with batched queries, and only the missing ones are uploaded."
+options:
+  paths:
+    description:
+      - Files, directories or glob patterns of the local files that should be turned into artifacts.
+      - Directories are searched recursively.
+    type: list
+    elements: path
+    required: true
+  chunk_size:
+    description:
+      - Size of the chunks to upload a file.
+      - C(auto) adapts the size to the throughput measured while uploading, starting at 8 MiB and staying between 1 MiB and 64 MiB.
+        The sizes used are returned as C(chunk_sizes).
+    type: raw
+    default: 33554432
+  concurrency:
+    description:
+      - Number of files to hash or upload at the same time.
+      - The C(upload_concurrency) chunks are shared by the files uploaded at the same time, so that at most
+        C(upload_concurrency) or C(concurrency) chunks, whichever is larger, are held in memory.
+    type: int
+    default: 4
+extends_documentation_fragment:
+  - pulp.squeezer.pulp.upload
+  - pulp.squeezer.pulp.glue
+  - pulp.squeezer.pulp
+author:
+  - Matthias Dellweg (@mdellweg)
+"""
+
+EXAMPLES = r"""
+- name: Upload all build outputs
+  pulp.squeezer.artifacts:
+    pulp_url: https://pulp.example.org
+    username: admin
+    password: password
+    paths:
+      - build/output
+    digest_cache: true
+  register: artifacts_result
+
+- name: Report the artifact of one of them
+  debug:
+    var: artifacts_result.artifacts[artifacts_result.files['build/output/release.iso']]
+"""
+
+RETURN = r"""
+  artifacts:
+    description: Pulp reference of the artifact per sha256 digest
+    type: dict
+    returned: always
+  files:
+    description: sha256 digest per file
+    type: dict
+    returned: always
+  uploaded:
+    description:
+      - sha256 digests of the files uploaded, or to be uploaded in check mode.
+      - Files uploaded by another host meanwhile are not included.
+    type: list
+    returned: always
+  failed:
+    description: Error message per file that could not be uploaded
+    type: dict
+    returned: when uploads failed
+  chunk_sizes:
+    description: Sizes of the chunks used in the order they were chosen
+    type: list
+    returned: when chunk_size is auto
+"""
+
+
+import glob
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from ansible_collections.pulp.squeezer.plugins.module_utils.pulp_glue import (
+    PulpAnsibleModule,
+    SqueezerException,
+    list_query_params,
+    upload_artifact,
+    upload_chunk_size,
+    upload_rate_limit,
+)
+from ansible_collections.pulp.squeezer.plugins.module_utils.upload import (
+    UPLOAD_ARGUMENT_SPEC,
+    AdaptiveChunkSize,
+    locked_upload,
+    upload_options,
+)
+
+try:
+    from pulp_glue.core.context import PulpArtifactContext
+
+    PULP_CLI_IMPORT_ERR = None
+except ImportError:
+    PULP_CLI_IMPORT_ERR = traceback.format_exc()
+
+
+# Number of digests to look up in one query.
+BATCH_SIZE = 50
+
+
+def collect_files(paths):
+    files = {}
+    for pattern in paths:
+        matches = glob.glob(pattern)
+        if not matches:
+            raise SqueezerException(f"No files found for '{pattern}'.")
+        for match in sorted(matches):
+            if os.path.isdir(match):
+                for dirpath, dirnames, filenames in os.walk(match):
+                    dirnames.sort()
+                    for filename in sorted(filenames):
+                        files[os.path.join(dirpath, filename)] = None
+            else:
+                files[match] = None
+    return list(files)
+
+
+def find_artifacts(artifact_ctx, digests, concurrency):
+    """
+    Return the hrefs of the artifacts present on the server by their digest.
+    """
+    digests = sorted(digests)
+    if "sha256__in" in list_query_params(artifact_ctx):
+        artifacts = {}
+        for start in range(0, len(digests), BATCH_SIZE):
+            chunk = digests[start : start + BATCH_SIZE]
+            parameters = {"sha256__in": chunk, "fields": ["pulp_href", "sha256"]}
+            for artifact in artifact_ctx.list(limit=len(chunk), offset=0, parameters=parameters):
+                artifacts[artifact["sha256"]] = artifact["pulp_href"]
+        return artifacts
+
+    # Fall back to one query per digest, sent in parallel.
+    def _find(digest):
+        result = artifact_ctx.list(
+            limit=1, offset=0, parameters={"sha256": digest, "fields": ["pulp_href"]}
+        )
+        return result[0]["pulp_href"] if result else None
+
+    if not digests:
+        return {}
+    # pulp-glue adopts the correlation id of the first response, so that one must not race.
+    hrefs = [_find(digests[0])]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        hrefs.extend(executor.map(_find, digests[1:]))
+    return {digest: href for digest, href in zip(digests, hrefs) if href is not None}
+
+
+def main():
+    with PulpAnsibleModule(
+        import_errors=[("pulp-glue", PULP_CLI_IMPORT_ERR)],
+        argument_spec={
+            "paths": {"type": "list", "elements": "path", "required": True},
+            "concurrency": {"type": "int", "default": 4},
+            **UPLOAD_ARGUMENT_SPEC,
+        },
+    ) as module:
+        concurrency = module.params["concurrency"]
+        chunk_size = upload_chunk_size(module.params)
+        rate_limit = upload_rate_limit(module.params)
+        files = collect_files(module.params["paths"])
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            digests = dict(zip(files, executor.map(module.sha256, files)))
+        module.set_result("files", digests)
+
+        artifact_ctx = PulpArtifactContext(module.pulp_ctx)
+        artifacts = find_artifacts(artifact_ctx, set(digests.values()), concurrency)
+        missing = {}
+        for path, digest in digests.items():
+            if digest not in artifacts:
+                missing.setdefault(digest, path)
+        module.set_result("artifacts", artifacts)
+        module.set_result("uploaded", sorted(missing))
+
+        if missing:
+            if module.check_mode:
+                module.set_changed()
+            else:
+
+                # Every chunk in flight is held in memory, so the files share the chunks.
+                upload_concurrency = max(
+                    module.params["upload_concurrency"] // min(concurrency, len(missing)), 1
+                )
+
+                def _upload(digest):
+                    options = upload_options(module.params, digest, chunk_size, rate_limit)
+                    options["upload_concurrency"] = upload_concurrency
+                    href, uploaded = locked_upload(
+                        options["upload_lock"],
+                        lambda: find_artifacts(artifact_ctx, [digest], 1).get(digest),
+                        lambda: _upload_artifact(digest, options),
+                    )
+                    if not uploaded:
+                        reused.add(digest)
+                    return href
+
+                def _upload_artifact(digest, options):
+                    return upload_artifact(
+                        module.pulp_ctx,
+                        missing[digest],
+                        digest,
+                        options["chunk_size"],
+                        concurrency=options["upload_concurrency"],
+                        retries=options["upload_retries"],
+                        resumable=options["resumable"],
+                        rate_limit=options["rate_limit"],
+                    )
+
+                failed = {}
+                reused = set()
+                with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    futures = {digest: executor.submit(_upload, digest) for digest in missing}
+                    for digest, future in futures.items():
+                        try:
+                            artifacts[digest] = future.result()
+                        except Exception as e:
+                            failed[missing[digest]] = str(e)
+                if isinstance(chunk_size, AdaptiveChunkSize):
+                    module.set_result("chunk_sizes", chunk_size.history)
+                uploaded = sorted(set(missing) & set(artifacts) - reused)
+                module.set_result("uploaded", uploaded)
+                if uploaded:
+                    module.set_changed()
+                if failed:
+                    module.set_result("failed", failed)
+                    raise SqueezerException(f"Failed to upload {len(failed)} files.")
+
+
+if __name__ == "__main__":
+    main()
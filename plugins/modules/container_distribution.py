@@ -45,6 +45,8 @@ options:
     required: false
 extends_documentation_fragment:
   - pulp.squeezer.pulp.entity_state
+  - pulp.squeezer.pulp.entity_info
+  - pulp.squeezer.pulp.entity_list
   - pulp.squeezer.pulp.glue
   - pulp.squeezer.pulp
 author:
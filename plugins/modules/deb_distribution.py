@@ -35,6 +35,7 @@ options:
 extends_documentation_fragment:
   - pulp.squeezer.pulp
   - pulp.squeezer.pulp.entity_state
+  - pulp.squeezer.pulp.entity_list
 author:
   - Matthias Dellweg (@mdellweg)
 """
@@ -50,6 +50,7 @@ options:
 extends_documentation_fragment:
   - pulp.squeezer.pulp
   - pulp.squeezer.pulp.entity_state
+  - pulp.squeezer.pulp.entity_list
   - pulp.squeezer.pulp.remote
 author:
   - Matthias Dellweg (@mdellweg)
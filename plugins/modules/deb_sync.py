@@ -29,6 +29,7 @@ options:
     required: false
     default: false
 extends_documentation_fragment:
+  - pulp.squeezer.pulp.progress
   - pulp.squeezer.pulp
 author:
   - Matthias Dellweg (@mdellweg)
@@ -53,6 +54,12 @@ RETURN = r"""
     description: Repository version after synching
     type: dict
     returned: always
+  progress:
+    description:
+      - Time series of up to 20 progress snapshots taken while waiting for the task.
+      - Each snapshot holds the C(done) counter of every progress report and its rate per second since the previous snapshot.
+    type: list
+    returned: when a task was waited for
 """
 
 
@@ -69,6 +76,9 @@ def main():
             "remote": {"required": True},
             "repository": {"required": True},
             "mirror": {"type": "bool", "default": False},
+            "progress_file": {"type": "path"},
+            "progress_journal": {"type": "bool", "default": False},
+            "progress_interval": {"type": "float", "default": 10},
         },
     ) as module:
         remote = PulpDebRemote(module, {"name": module.params["remote"]})
@@ -17,6 +17,7 @@ options:
       for cleanup task
     type: int
 extends_documentation_fragment:
+  - pulp.squeezer.pulp.task
   - pulp.squeezer.pulp.glue
   - pulp.squeezer.pulp
 author:
@@ -36,6 +37,14 @@ RETURN = r"""
     description: Summary of deleted entities
     type: dict
     returned: always
+  task:
+    description: Href of the dispatched task
+    type: str
+    returned: when I(wait) is false and a task was dispatched or when waiting for the task timed out
+  still_running:
+    description: Whether the module timed out while the task it waits for is still running
+    type: bool
+    returned: when waiting for the task timed out
 """
 
 
@@ -57,6 +66,7 @@ def main():
         import_errors=[("pulp-glue", PULP_CLI_IMPORT_ERR)],
         argument_spec={
             "protection_time": {"type": "int"},
+            "wait": {"type": "bool", "default": True},
         },
     ) as module:
         if not module.check_mode:
@@ -25,10 +25,25 @@ options:
     description:
       - A path to a file tobe uploaded as the new content unit.
     type: path
+  artifact:
+    description:
+      - Pulp reference of an existing artifact to create the content unit from instead of uploading C(file).
+    type: str
+  remote_src:
+    description:
+      - Whether C(file) is on the managed node.
+      - If C(false), C(file) is searched for on the controller like the source of M(ansible.builtin.copy). The controller
+        uploads it straight to the pulp server while hashing it, and the module only gets to see the resulting artifact.
+        Connection parameters not given to the task are taken from the C(SQUEEZER_*) environment variables of the controller.
+      - For other states than C(present), the controller only computes the digest of C(file) and the module gets that instead.
+    type: bool
+    default: true
   chunk_size:
     description:
       - Chunk size in bytes used to upload the file.
-    type: int
+      - C(auto) adapts the size to the throughput measured while uploading, starting at 8 MiB and staying between 1 MiB and 64 MiB.
+        The sizes used are returned as C(chunk_sizes).
+    type: raw
     default: 33554432
   repository:
     description:
@@ -36,6 +51,9 @@ options:
     type: str
 extends_documentation_fragment:
   - pulp.squeezer.pulp.entity_state
+  - pulp.squeezer.pulp.entity_info
+  - pulp.squeezer.pulp.entity_list
+  - pulp.squeezer.pulp.upload
   - pulp.squeezer.pulp.glue
   - pulp.squeezer.pulp
 author:
@@ -72,6 +90,10 @@ RETURN = r"""
     description: File content unit details
     type: dict
     returned: when digest and relative_path is given
+  chunk_sizes:
+    description: Sizes of the chunks used in the order they were chosen
+    type: list
+    returned: when chunk_size is auto
 """
 
 
@@ -81,13 +103,90 @@ import traceback
 from ansible_collections.pulp.squeezer.plugins.module_utils.pulp_glue import (
     PulpEntityAnsibleModule,
     SqueezerException,
+    upload_chunk_size,
+    upload_file,
+    upload_rate_limit,
+)
+from ansible_collections.pulp.squeezer.plugins.module_utils.upload import (
+    UPLOAD_ARGUMENT_SPEC,
+    AdaptiveChunkSize,
+    file_sha256,
+    lookup_sha256,
+    upload_options,
 )
 
 try:
-    from pulp_glue.file.context import PulpFileContentContext, PulpFileRepositoryContext
+    from pulp_glue.common.context import PluginRequirement, PulpEntityNotFound
+    from pulp_glue.core.context import PulpArtifactContext
+    from pulp_glue.file.context import PulpFileContentContext as _PulpFileContentContext
+    from pulp_glue.file.context import PulpFileRepositoryContext
 
     PULP_CLI_IMPORT_ERR = None
 
+    # Patch the Context to upload the chunks of large files in parallel.
+    class PulpFileContentContext(_PulpFileContentContext):
+        def converge(self, desired_attributes, defaults=None):
+            defaults = dict(defaults or {})
+            upload_lock = defaults.pop("upload_lock", None)
+            if upload_lock is not None and desired_attributes is not None:
+                try:
+                    self.entity
+                except PulpEntityNotFound:
+                    # Wait for another host uploading the same file, it may create this content.
+                    with upload_lock:
+                        return super().converge(desired_attributes, defaults=defaults)
+            return super().converge(desired_attributes, defaults=defaults)
+
+        def create(self, body, parameters=None, non_blocking=False):
+            body = body.copy()
+            concurrency = body.pop("upload_concurrency", 4)
+            retries = body.pop("upload_retries", 3)
+            resumable = body.pop("resumable", None)
+            rate_limit = body.pop("rate_limit", None)
+            verify_sha256 = body.pop("verify_sha256", False)
+            file = body.get("file")
+            chunk_size = body.get("chunk_size")
+            if (
+                file
+                and chunk_size
+                and not self.pulp_ctx.fake_mode
+                and int(chunk_size) <= os.path.getsize(file)
+                and self.pulp_ctx.has_plugin(PluginRequirement("core", specifier=">=3.20.0"))
+            ):
+                del body["file"]
+                del body["chunk_size"]
+                upload_ctx, _digest = upload_file(
+                    self.pulp_ctx,
+                    file,
+                    chunk_size,
+                    concurrency=concurrency,
+                    retries=retries,
+                    sha256=body.get("sha256"),
+                    resumable=resumable,
+                    rate_limit=rate_limit,
+                )
+                body["upload"] = upload_ctx.pulp_href
+                try:
+                    return super().create(body, parameters=parameters, non_blocking=non_blocking)
+                except Exception:
+                    upload_ctx.delete()
+                    raise
+                finally:
+                    if resumable is not None:
+                        # Creating the content consumes the upload.
+                        resumable.clear()
+            else:
+                if chunk_size is not None:
+                    body["chunk_size"] = int(chunk_size)
+                if file and not self.pulp_ctx.fake_mode:
+                    # The server does not check the digest of content uploaded in one request.
+                    if verify_sha256 and file_sha256(file) != body.get("sha256"):
+                        raise SqueezerException("File checksum mismatch.")
+                    if rate_limit is not None:
+                        # pulp-glue sends the file itself, so it is accounted for as a whole.
+                        rate_limit.acquire(os.path.getsize(file))
+            return super().create(body, parameters=parameters, non_blocking=non_blocking)
+
 except ImportError:
     PULP_CLI_IMPORT_ERR = traceback.format_exc()
     PulpFileContentContext = None
@@ -103,24 +202,28 @@ def main():
             "sha256": {"aliases": ["digest"]},
             "relative_path": {},
             "file": {"type": "path"},
-            "chunk_size": {"type": "int", "default": 33554432},
+            "artifact": {},
+            "remote_src": {"type": "bool", "default": True},
+            **UPLOAD_ARGUMENT_SPEC,
             "repository": {},
         },
         required_if=[
-            ("state", "present", ["file", "relative_path", "repository"]),
+            ("state", "present", ["relative_path", "repository"]),
+            ("state", "present", ["file", "artifact"], True),
             ("state", "absent", ["relative_path", "repository"]),
         ],
+        mutually_exclusive=[("file", "artifact")],
     ) as module:
         sha256 = module.params["sha256"]
+        chunk_size = upload_chunk_size(module.params)
         if module.params["file"]:
             if not os.path.exists(module.params["file"]):
                 raise SqueezerException("File not found.")
-            file_sha256 = module.sha256(module.params["file"])
-            if sha256:
-                if sha256 != file_sha256:
-                    raise SqueezerException("File checksum mismatch.")
-            else:
-                sha256 = file_sha256
+            sha256 = lookup_sha256(module.params["file"], sha256, module.digest_cache)
+        elif module.params["artifact"] and sha256 is None:
+            sha256 = PulpArtifactContext(
+                module.pulp_ctx, pulp_href=module.params["artifact"]
+            ).entity["sha256"]
 
         if sha256 is None and module.state == "absent":
             raise SqueezerException(
@@ -134,15 +237,30 @@ def main():
         desired_attributes = {}
         defaults = {
             "file": module.params["file"],
-            "chunk_size": module.params["chunk_size"],
+            # A digest computed from the file needs no verification.
+            "verify_sha256": (
+                module.params["file"] is not None and module.params["sha256"] is not None
+            ),
+            **upload_options(
+                module.params,
+                sha256,
+                chunk_size,
+                upload_rate_limit(module.params),
+                check_mode=module.check_mode,
+            ),
         }
 
+        if module.params["artifact"]:
+            defaults["artifact"] = module.params["artifact"]
+
         if module.params["repository"]:
             module.context.repository_ctx = PulpFileRepositoryContext(
                 module.pulp_ctx, entity={"name": module.params["repository"]}
             )
 
         module.process(natural_key, desired_attributes, defaults=defaults)
+        if isinstance(chunk_size, AdaptiveChunkSize):
+            module.set_result("chunk_sizes", chunk_size.history)
 
 
 if __name__ == "__main__":
@@ -28,6 +28,9 @@ options:
     required: false
 extends_documentation_fragment:
   - pulp.squeezer.pulp.entity_state
+  - pulp.squeezer.pulp.entity_info
+  - pulp.squeezer.pulp.entity_list
+  - pulp.squeezer.pulp.task
   - pulp.squeezer.pulp.glue
   - pulp.squeezer.pulp
 author:
@@ -71,6 +74,14 @@ RETURN = r"""
     description: File publication details
     type: dict
     returned: when repository is given
+  task:
+    description: Href of the dispatched task
+    type: str
+    returned: when I(wait) is false and a task was dispatched or when waiting for the task timed out
+  still_running:
+    description: Whether the module timed out while the task it waits for is still running
+    type: bool
+    returned: when waiting for the task timed out
 """
 
 
@@ -97,6 +108,7 @@ def main():
             "repository": {},
             "version": {"type": "int"},
             "manifest": {},
+            "wait": {"type": "bool", "default": True},
         },
         required_if=(
             ["state", "present", ["repository"]],
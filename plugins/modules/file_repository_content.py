@@ -60,6 +60,7 @@ options:
         type: str
         required: true
 extends_documentation_fragment:
+  - pulp.squeezer.pulp.task
   - pulp.squeezer.pulp.glue
   - pulp.squeezer.pulp
 author:
@@ -94,6 +95,14 @@ RETURN = r"""
     description: List of content unit hrefs that were removed
     type: list
     returned: always
+  task:
+    description: Href of the dispatched task
+    type: str
+    returned: when I(wait) is false and a task was dispatched or when waiting for the task timed out
+  still_running:
+    description: Whether the module timed out while the task it waits for is still running
+    type: bool
+    returned: when waiting for the task timed out
 """
 
 
@@ -132,6 +141,7 @@ def main():
                     "sha256": {"required": True, "aliases": ["digest"]},
                 },
             },
+            "wait": {"type": "bool", "default": True},
         },
     ) as module:
         repository_name = module.params["repository"]
@@ -23,6 +23,8 @@ options:
     type: str
     required: true
 extends_documentation_fragment:
+  - pulp.squeezer.pulp.progress
+  - pulp.squeezer.pulp.task
   - pulp.squeezer.pulp.glue
   - pulp.squeezer.pulp
 author:
@@ -41,6 +43,33 @@ EXAMPLES = r"""
 - name: Report synched repository version
   debug:
     var: sync_result.repository_version
+
+- name: Sync, re-attaching to the same sync task on retries if it takes longer than the timeout
+  pulp.squeezer.file_sync:
+    pulp_url: https://pulp.example.org
+    username: admin
+    password: password
+    repository: file_repo_1
+    timeout: 600
+  register: sync_result
+  until: sync_result is not failed or not sync_result.still_running | default(false)
+  retries: 6
+
+- name: Dispatch the sync without waiting for it
+  pulp.squeezer.file_sync:
+    pulp_url: https://pulp.example.org
+    username: admin
+    password: password
+    repository: file_repo_1
+    wait: false
+  register: sync_result
+- name: Wait for the sync to finish
+  pulp.squeezer.task:
+    pulp_url: https://pulp.example.org
+    username: admin
+    password: password
+    pulp_href: "{{ sync_result.task }}"
+    state: completed
 """
 
 RETURN = r"""
@@ -48,6 +77,20 @@ RETURN = r"""
     description: Repository version after synching
     type: dict
     returned: always
+  task:
+    description: Href of the dispatched task
+    type: str
+    returned: when I(wait) is false and a task was dispatched or when waiting for the task timed out
+  still_running:
+    description: Whether the module timed out while the task it waits for is still running
+    type: bool
+    returned: when waiting for the task timed out
+  progress:
+    description:
+      - Time series of up to 20 progress snapshots taken while waiting for the task.
+      - Each snapshot holds the C(done) counter of every progress report and its rate per second since the previous snapshot.
+    type: list
+    returned: when a task was waited for
 """
 
 
@@ -72,6 +115,10 @@ def main():
         argument_spec={
             "remote": {"required": False},
             "repository": {"required": True},
+            "wait": {"type": "bool", "default": True},
+            "progress_file": {"type": "path"},
+            "progress_journal": {"type": "bool", "default": False},
+            "progress_interval": {"type": "float", "default": 10},
         },
     ) as module:
         repository_ctx = PulpFileRepositoryContext(
@@ -93,6 +140,7 @@ def main():
         repository_version = repository["latest_version_href"]
         # In check_mode, assume nothing changed
         if not module.check_mode:
+            module.record_progress()
             sync_task = repository_ctx.sync(body=payload)
 
             if sync_task["created_resources"]:
@@ -24,7 +24,20 @@ options:
       - canceled
       - completed
       - failed
+  window:
+    description:
+      - Purge in slices of this many seconds, starting at the oldest matching task and moving I(finished_before) forward.
+      - Each slice is a separate purge task, which keeps the database transactions short on large task tables.
+      - If I(finished_before) is not specified, the server default of 30 days ago is used as the end of the last slice.
+      - With I(wait=false) only the first slice is dispatched.
+    type: int
+  window_pause:
+    description:
+      - Time in seconds to pause between two slices.
+    type: float
+    default: 1
 extends_documentation_fragment:
+  - pulp.squeezer.pulp.task
   - pulp.squeezer.pulp.glue
   - pulp.squeezer.pulp
 author:
@@ -41,18 +54,37 @@ EXAMPLES = r"""
 - name: Report removed tasks
   debug:
     var: task_purge_summary
+
+- name: Remove completed tasks older than a week in daily slices
+  pulp.squeezer.purge_tasks:
+    pulp_url: https://pulp.example.org
+    username: admin
+    password: password
+    finished_before: "{{ '%Y-%m-%dT%H:%M:%S+00:00' | strftime(ansible_date_time.epoch | int - 604800, utc=true) }}"
+    states:
+      - completed
+    window: 86400
 """
 
 RETURN = r"""
   summary:
-    description: Task purge details
+    description: Task purge details, added up over all slices
     type: dict
     returned: always
+  task:
+    description: Href of the dispatched task
+    type: str
+    returned: when I(wait) is false and a task was dispatched or when waiting for the task timed out
+  still_running:
+    description: Whether the module timed out while the task it waits for is still running
+    type: bool
+    returned: when waiting for the task timed out
 """
 
 
+import time
 import traceback
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from ansible_collections.pulp.squeezer.plugins.module_utils.pulp_glue import PulpAnsibleModule
 
@@ -64,6 +96,46 @@ except ImportError:
     PULP_CLI_IMPORT_ERR = traceback.format_exc()
 
 
+# The server purges tasks older than this if no finished_before is given.
+DEFAULT_AGE = timedelta(days=30)
+
+
+def add_reports(summary, purge_task):
+    for report in purge_task["progress_reports"]:
+        if report["code"] == "purge.tasks.total":
+            summary["total"] += report["total"]
+        elif report["code"] == "purge.tasks.error":
+            summary["errors"] += report["total"]
+        elif report["code"].startswith("purge.tasks.key"):
+            key = report["code"][16:]
+            summary["objects"][key] = summary["objects"].get(key, 0) + report["total"]
+
+
+def slice_ends(task_ctx, finished_before, states, window):
+    if finished_before is None:
+        finished_before = datetime.now(timezone.utc) - DEFAULT_AGE
+    elif finished_before.tzinfo is None:
+        finished_before = finished_before.replace(tzinfo=timezone.utc)
+    oldest = task_ctx.list(
+        limit=1,
+        offset=0,
+        parameters={
+            "state__in": states or ["canceled", "completed", "failed"],
+            "finished_at__lt": finished_before.isoformat(),
+            "ordering": ["finished_at"],
+            "fields": ["finished_at"],
+        },
+    )
+    if oldest:
+        end = datetime.fromisoformat(oldest[0]["finished_at"].replace("Z", "+00:00"))
+        while True:
+            end += timedelta(seconds=window)
+            if end >= finished_before:
+                break
+            yield end
+    yield finished_before
+
+
 def main():
     with PulpAnsibleModule(
         import_errors=[("pulp-glue", PULP_CLI_IMPORT_ERR)],
@@ -74,6 +146,9 @@ def main():
                 "elements": "str",
                 "choices": ["canceled", "completed", "failed"],
             },
+            "window": {"type": "int"},
+            "window_pause": {"type": "float", "default": 1},
+            "wait": {"type": "bool", "default": True},
         },
     ) as module:
         task_ctx = PulpTaskContext(module.pulp_ctx)
@@ -82,16 +157,18 @@ def main():
         if finished_before is not None:
             finished_before = datetime.fromisoformat(finished_before)
         if not module.check_mode:
-            purge_task = task_ctx.purge(
-                finished_before=finished_before, states=module.params["states"]
-            )
-            for report in purge_task["progress_reports"]:
-                if report["code"] == "purge.tasks.total":
-                    summary["total"] = report["total"]
-                elif report["code"] == "purge.tasks.error":
-                    summary["errors"] = report["total"]
-                elif report["code"].startswith("purge.tasks.key"):
-                    summary["objects"][report["code"][16:]] = report["total"]
+            if module.params["window"] is None:
+                ends = [finished_before]
+            else:
+                ends = slice_ends(
+                    task_ctx, finished_before, module.params["states"], module.params["window"]
+                )
+            for i, end in enumerate(ends):
+                if i:
+                    time.sleep(module.params["window_pause"])
+                purge_task = task_ctx.purge(finished_before=end, states=module.params["states"])
+                add_reports(summary, purge_task)
+                module.set_result("summary", summary)
         module.set_changed()
         module.set_result("summary", summary)
 
@@ -22,6 +22,7 @@ options:
     type: int
     required: false
 extends_documentation_fragment:
+  - pulp.squeezer.pulp.task
   - pulp.squeezer.pulp.glue
   - pulp.squeezer.pulp
 author:
@@ -57,6 +58,14 @@ RETURN = r"""
     description: Number of successfully repaired artifacts
     type: int
     returned: if available
+  task:
+    description: Href of the dispatched task
+    type: str
+    returned: when I(wait) is false and a task was dispatched or when waiting for the task timed out
+  still_running:
+    description: Whether the module timed out while the task it waits for is still running
+    type: bool
+    returned: when waiting for the task timed out
 """
 
 import re
@@ -96,6 +105,7 @@ def main():
         argument_spec={
             "repository": {"required": True},
             "version": {"type": "int"},
+            "wait": {"type": "bool", "default": True},
         },
     ) as module:
         repository_ctx = PulpRepositoryContext(
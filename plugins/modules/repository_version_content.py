@@ -0,0 +1,251 @@
+#!/usr/bin/python
+
+# copyright (c) 2024, Matthias Dellweg
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+DOCUMENTATION = r"""
+---
+module: repository_version_content
+short_description: List the content of a repository version on a pulp server
+description:
+  - "This module lists the content units present in, added to or removed from a repository version."
+  - "The content summary of the version is read first and the pages of each content type are fetched concurrently from their typed endpoints."
+options:
+  repository:
+    description:
+      - Name of the repository
+    type: str
+    required: true
+  version:
+    description:
+      - Number of the repository version to inspect
+      - If not specified, the latest version is used.
+    type: int
+    required: false
+  view:
+    description:
+      - Which content of the repository version to list.
+    type: str
+    choices:
+      - present
+      - added
+      - removed
+    default: present
+  fields:
+    description:
+      - Only retrieve these fields of the content units.
+    type: list
+    elements: str
+  concurrency:
+    description:
+      - Number of pages to fetch at the same time.
+      - At most this many pages are held in memory while waiting to be returned or written.
+    type: int
+    default: 4
+  dest:
+    description:
+      - Path to a file to stream the content units to as JSON lines instead of returning them.
+    type: path
+extends_documentation_fragment:
+  - pulp.squeezer.pulp.glue
+  - pulp.squeezer.pulp
+author:
+  - Matthias Dellweg (@mdellweg)
+"""
+
+EXAMPLES = r"""
+- name: List the names and versions of packages in the latest version of a repository
+  pulp.squeezer.repository_version_content:
+    pulp_url: https://pulp.example.org
+    username: admin
+    password: password
+    repository: my_rpm_repo
+    fields:
+      - pulp_href
+      - name
+      - version
+  register: content_result
+- name: Report the content
+  debug:
+    var: content_result.contents
+
+- name: Write the content removed in version 12 to a file
+  pulp.squeezer.repository_version_content:
+    pulp_url: https://pulp.example.org
+    username: admin
+    password: password
+    repository: my_rpm_repo
+    version: 12
+    view: removed
+    dest: /tmp/removed_content.jsonl
+"""
+
+RETURN = r"""
+  repository_version:
+    description: Href of the inspected repository version
+    type: str
+    returned: always
+  summary:
+    description: Number of content units per content type
+    type: dict
+    returned: always
+  contents:
+    description: Lists of content units per content type
+    type: dict
+    returned: when dest is not given
+"""
+
+
+import filecmp
+import json
+import os
+import re
+import tempfile
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from importlib import import_module
+from urllib.parse import parse_qs, urlparse
+
+from ansible_collections.pulp.squeezer.plugins.module_utils.pulp_glue import (
+    PulpAnsibleModule,
+    SqueezerException,
+)
+
+try:
+    from pulp_glue.common.context import BATCH_SIZE, PulpRepositoryContext
+
+    PULP_CLI_IMPORT_ERR = None
+except ImportError:
+    PULP_CLI_IMPORT_ERR = traceback.format_exc()
+else:
+    # Register the repository types of the installed plugins.
+    for plugin in [
+        "ansible",
+        "container",
+        "deb",
+        "file",
+        "gem",
+        "maven",
+        "ostree",
+        "python",
+        "rpm",
+    ]:
+        with suppress(ImportError):
+            import_module(f"pulp_glue.{plugin}.context")
+
+
+def list_operations(pulp_ctx):
+    return {
+        path: operation_id
+        for operation_id, (method, path) in pulp_ctx.api.operations.items()
+        if method == "get" and operation_id.endswith("_list")
+    }
+
+
+def page_requests(pulp_ctx, content_summary, fields):
+    operations = list_operations(pulp_ctx)
+    for pulp_type, entry in sorted(content_summary.items()):
+        url = urlparse(entry["href"])
+        operation_id = operations.get(url.path)
+        if operation_id is None:
+            raise SqueezerException(f"Cannot list content of type '{pulp_type}'.")
+        parameters = {key: value[0] for key, value in parse_qs(url.query).items()}
+        parameters["limit"] = BATCH_SIZE
+        if "ordering" in pulp_ctx.api.param_spec(operation_id, "query"):
+            # Pages fetched concurrently must not overlap or leave gaps.
+            parameters["ordering"] = ["pulp_id"]
+        if fields:
+            parameters["fields"] = fields
+        for offset in range(0, entry["count"], BATCH_SIZE):
+            yield pulp_type, operation_id, dict(parameters, offset=offset)
+
+
+def bounded_map(executor, function, iterable, window):
+    """
+    Like `executor.map`, but only submit up to `window` calls ahead of the results consumed.
+    """
+    futures = deque()
+    for item in iterable:
+        if len(futures) >= window:
+            yield futures.popleft().result()
+        futures.append(executor.submit(function, item))
+    while futures:
+        yield futures.popleft().result()
+
+
+def main():
+    with PulpAnsibleModule(
+        import_errors=[("pulp-glue", PULP_CLI_IMPORT_ERR)],
+        argument_spec={
+            "repository": {"required": True},
+            "version": {"type": "int"},
+            "view": {"choices": ["present", "added", "removed"], "default": "present"},
+            "fields": {"type": "list", "elements": "str"},
+            "concurrency": {"type": "int", "default": 4},
+            "dest": {"type": "path"},
+        },
+    ) as module:
+        repository_ctx = PulpRepositoryContext(
+            module.pulp_ctx, entity={"name": module.params["repository"]}
+        )
+        # "cast" to the proper subclass
+        m = re.search(repository_ctx.HREF_PATTERN, repository_ctx.pulp_href)
+        plugin = m.group("plugin")
+        resource_type = m.group("resource_type")
+        repository_ctx = PulpRepositoryContext.TYPE_REGISTRY[f"{plugin}:{resource_type}"](
+            module.pulp_ctx, pulp_href=repository_ctx.pulp_href
+        )
+        repository_version_ctx = repository_ctx.get_version_context()
+        if module.params["version"] is None:
+            repository_version_ctx.pulp_href = repository_ctx.entity["latest_version_href"]
+        else:
+            repository_version_ctx.entity = {"number": module.params["version"]}
+
+        content_summary = repository_version_ctx.entity["content_summary"][module.params["view"]]
+        module.set_result("repository_version", repository_version_ctx.pulp_href)
+        module.set_result(
+            "summary", {pulp_type: entry["count"] for pulp_type, entry in content_summary.items()}
+        )
+
+        dest = module.params["dest"]
+        concurrency = module.params["concurrency"]
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            # Pages are consumed in order, so the output is stable regardless of timing.
+            pages = bounded_map(
+                executor,
+                lambda page: (
+                    page[0],
+                    module.pulp_ctx.call(page[1], parameters=page[2])["results"],
+                ),
+                page_requests(module.pulp_ctx, content_summary, module.params["fields"]),
+                concurrency,
+            )
+            if dest is None:
+                contents = {pulp_type: [] for pulp_type in content_summary}
+                for pulp_type, results in pages:
+                    contents[pulp_type].extend(results)
+                module.set_result("contents", contents)
+            else:
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(dest)))
+                try:
+                    with os.fdopen(fd, "w") as f:
+                        for pulp_type, results in pages:
+                            for entity in results:
+                                f.write(json.dumps(entity) + "\n")
+                    unchanged = os.path.isfile(dest) and filecmp.cmp(tmp_path, dest, shallow=False)
+                except Exception:
+                    os.unlink(tmp_path)
+                    raise
+                if unchanged or module.check_mode:
+                    os.unlink(tmp_path)
+                else:
+                    module.atomic_move(tmp_path, dest)
+                if not unchanged:
+                    module.set_changed()
+
+
+if __name__ == "__main__":
+    main()
@@ -46,6 +46,7 @@ options:
     default: true
 
 extends_documentation_fragment:
+  - pulp.squeezer.pulp.progress
   - pulp.squeezer.pulp
 author:
   - Jacob Floyd (@cognifloyd)
@@ -70,6 +71,12 @@ RETURN = r"""
     description: Repository version after synching
     type: dict
     returned: always
+  progress:
+    description:
+      - Time series of up to 20 progress snapshots taken while waiting for the task.
+      - Each snapshot holds the C(done) counter of every progress report and its rate per second since the previous snapshot.
+    type: list
+    returned: when a task was waited for
 """
 
 
@@ -98,6 +105,9 @@ def main():
                 "choices": ["srpm", "treeinfo"],
             },
             "optimize": {"type": "bool", "default": True},
+            "progress_file": {"type": "path"},
+            "progress_journal": {"type": "bool", "default": False},
+            "progress_interval": {"type": "float", "default": 10},
         },
     ) as module:
         remote = PulpRpmRemote(module, {"name": module.params["remote"]})
@@ -10,11 +10,67 @@ module: task
 short_description: Manage tasks of a pulp api server instance
 description:
   - "This performs list, show and cancel operations on tasks in a pulp server."
+  - "It can also wait for or cancel many tasks at once, polling all of them with a single request per interval."
 options:
   pulp_href:
     description:
       - Pulp reference of the task to query or manipulate
     type: str
+  pulp_hrefs:
+    description:
+      - Pulp references of multiple tasks to query, wait for or cancel.
+      - With I(state=completed), the module waits until all of these tasks are finished.
+      - With I(state=canceled), all unfinished tasks are canceled and waited for.
+      - Only the tasks that are still unfinished are polled in each interval.
+    type: list
+    elements: str
+  task_filter:
+    description:
+      - Select the tasks to query, wait for or cancel on the server instead of listing them in I(pulp_hrefs).
+      - With I(state=canceled), only waiting and running tasks are selected unless I(task_filter.state) is given.
+    type: dict
+    suboptions:
+      state:
+        description:
+          - Only select tasks in one of these states.
+        type: list
+        elements: str
+        choices:
+          - waiting
+          - skipped
+          - running
+          - completed
+          - failed
+          - canceled
+          - canceling
+      name:
+        description:
+          - Only select tasks with this name, e.g. C(pulp_file.app.tasks.synchronizing.synchronize).
+        type: str
+      worker:
+        description:
+          - Only select tasks running on the worker with this name or href.
+        type: str
+      reserved_resource:
+        description:
+          - Only select tasks holding a reservation on this resource, e.g. a repository href.
+        type: str
+      created_before:
+        description:
+          - Only select tasks created before this ISO 8601 timestamp.
+          - This needs the C(pulp_created) filters on the tasks list endpoint.
+        type: str
+  concurrency:
+    description:
+      - Number of cancel requests to send at the same time.
+    type: int
+    default: 8
+  fail_fast:
+    description:
+      - Stop waiting for I(pulp_hrefs) as soon as one of the tasks failed or was canceled.
+      - Otherwise all tasks are waited for, before the module fails if any of them did not complete.
+    type: bool
+    default: false
   state:
     description:
       - Desired state of the task.
@@ -24,6 +80,8 @@ options:
       - canceled
       - completed
 extends_documentation_fragment:
+  - pulp.squeezer.pulp.entity_info
+  - pulp.squeezer.pulp.entity_list
   - pulp.squeezer.pulp.glue
   - pulp.squeezer.pulp
 author:
@@ -40,6 +98,25 @@ EXAMPLES = r"""
 - name: Report pulp tasks
   debug:
     var: task_summary
+
+- name: Wait for a batch of previously dispatched tasks
+  pulp.squeezer.task:
+    pulp_url: https://pulp.example.org
+    username: admin
+    password: password
+    pulp_hrefs: "{{ sync_results.results | map(attribute='task') | list }}"
+    state: completed
+  register: task_summary
+
+- name: Cancel all unfinished syncs of a repository
+  pulp.squeezer.task:
+    pulp_url: https://pulp.example.org
+    username: admin
+    password: password
+    task_filter:
+      name: pulp_file.app.tasks.synchronizing.synchronize
+      reserved_resource: "{{ repository.pulp_href }}"
+    state: canceled
 """
 
 RETURN = r"""
@@ -51,19 +128,28 @@ RETURN = r"""
     description: Task details
     type: dict
     returned: when id is given
+  summary:
+    description: Number of the tasks given in I(pulp_hrefs) or selected by I(task_filter) per state
+    type: dict
+    returned: when pulp_hrefs or task_filter is given
 """
 
 
+import datetime
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 
 from ansible_collections.pulp.squeezer.plugins.module_utils.pulp_glue import (
     PulpEntityAnsibleModule,
     SqueezerException,
+    list_query_params,
+    parse_datetime,
 )
 
 try:
-    from pulp_glue.common.context import PulpEntityNotFound
-    from pulp_glue.core.context import PulpTaskContext
+    from pulp_glue.common.context import PulpEntityNotFound, PulpException
+    from pulp_glue.core.context import PulpTaskContext, PulpWorkerContext
 
     PULP_CLI_IMPORT_ERR = None
 except ImportError:
@@ -71,6 +157,13 @@ except ImportError:
     PulpTaskContext = None
 
 
+FINISHED_STATES = ["completed", "failed", "canceled", "skipped"]
+CANCELABLE_STATES = ["waiting", "running"]
+UNSUCCESSFUL_STATES = ["failed", "canceled"]
+# Keep the query string of the aggregated poll within common request line limits.
+HREF_CHUNK_SIZE = 50
+
+
 class PulpTaskAnsibleModule(PulpEntityAnsibleModule):
     def process_special(self, desired_attributes, defaults=None):
         if self.state in ["canceled", "completed"]:
@@ -91,6 +184,121 @@ class PulpTaskAnsibleModule(PulpEntityAnsibleModule):
             return entity
         return super().process_special(entity, desired_attributes, defaults)
 
+    def list_tasks(self, task_hrefs, states=None):
+        tasks = []
+        for i in range(0, len(task_hrefs), HREF_CHUNK_SIZE):
+            chunk = task_hrefs[i : i + HREF_CHUNK_SIZE]
+            parameters = {"pulp_href__in": chunk, "limit": len(chunk), "offset": 0}
+            if states is not None:
+                parameters["state__in"] = states
+            tasks.extend(self.context.call("list", parameters=parameters)["results"])
+        return tasks
+
+    def select_tasks(self, task_filter):
+        parameters = {"fields": ["pulp_href"]}
+        states = task_filter["state"]
+        if states is None and self.state == "canceled":
+            states = CANCELABLE_STATES
+        if states is not None:
+            parameters["state__in"] = states
+        if task_filter["name"] is not None:
+            parameters["name"] = task_filter["name"]
+        if task_filter["worker"] is not None:
+            if task_filter["worker"].startswith("/"):
+                parameters["worker"] = task_filter["worker"]
+            else:
+                parameters["worker"] = PulpWorkerContext(
+                    self.pulp_ctx, entity={"name": task_filter["worker"]}
+                ).pulp_href
+        if task_filter["reserved_resource"] is not None:
+            parameters["reserved_resources"] = task_filter["reserved_resource"]
+        if task_filter["created_before"] is not None:
+            if "pulp_created__lt" not in list_query_params(self.context):
+                raise SqueezerException("Tasks cannot be selected by their creation time.")
+            try:
+                parameters["pulp_created__lt"] = parse_datetime(task_filter["created_before"])
+            except ValueError:
+                raise SqueezerException("created_before must be an ISO 8601 timestamp.")
+        return [task["pulp_href"] for task in self.list_entities(parameters=parameters)]
+
+    def cancel_tasks(self, task_hrefs):
+        def _cancel(task_href):
+            try:
+                self.pulp_ctx.call(
+                    "tasks_cancel", parameters={"task_href": task_href}, body={"state": "canceled"}
+                )
+            except PulpException as e:
+                # The task may have finished in the meantime.
+                self.warn(f"Could not cancel task {task_href}: {e}")
+
+        with ThreadPoolExecutor(max_workers=self.params["concurrency"]) as executor:
+            list(executor.map(_cancel, task_hrefs))
+
+    def process_tasks(self, task_hrefs):
+        tasks = {task["pulp_href"]: task for task in self.list_tasks(task_hrefs)}
+        missing = [task_href for task_href in task_hrefs if task_href not in tasks]
+        if missing:
+            raise SqueezerException(f"Tasks not found: {', '.join(missing)}.")
+        pending = [
+            task_href for task_href in tasks if tasks[task_href]["state"] not in FINISHED_STATES
+        ]
+
+        if self.state in ["canceled", "completed"] and pending:
+            if not self.check_mode:
+                if self.state == "canceled":
+                    self.cancel_tasks(
+                        [
+                            task_href
+                            for task_href in pending
+                            if tasks[task_href]["state"] in CANCELABLE_STATES
+                        ]
+                    )
+                timeout = self.pulp_ctx.timeout
+                deadline = datetime.datetime.now() + timeout if timeout else None
+                intervals = self.pulp_ctx.polling_policy.intervals()
+                while pending:
+                    if (
+                        self.state == "completed"
+                        and self.params["fail_fast"]
+                        and any(task["state"] in UNSUCCESSFUL_STATES for task in tasks.values())
+                    ):
+                        break
+                    if deadline and datetime.datetime.now() > deadline:
+                        break
+                    time.sleep(next(intervals))
+                    for task in self.list_tasks(pending, states=FINISHED_STATES):
+                        tasks[task["pulp_href"]] = task
+                    pending = [
+                        task_href
+                        for task_href in pending
+                        if tasks[task_href]["state"] not in FINISHED_STATES
+                    ]
+            else:
+                # Fake it
+                for task_href in pending:
+                    tasks[task_href]["state"] = self.state
+                pending = []
+            self.set_changed()
+
+        summary = {}
+        for task in tasks.values():
+            summary[task["state"]] = summary.get(task["state"], 0) + 1
+        self.set_result("tasks", [tasks[task_href] for task_href in task_hrefs])
+        self.set_result("summary", summary)
+
+        if self.state == "completed":
+            unsuccessful = [
+                task_href
+                for task_href, task in tasks.items()
+                if task["state"] in UNSUCCESSFUL_STATES
+            ]
+            if unsuccessful:
+                raise SqueezerException(
+                    f"{len(unsuccessful)} tasks did not complete: {', '.join(unsuccessful)}."
+                )
+        if self.state in ["canceled", "completed"] and pending:
+            raise SqueezerException(f"Waiting for {len(pending)} tasks timed out.")
+
 
 def main():
     with PulpTaskAnsibleModule(
@@ -100,20 +308,51 @@ def main():
         import_errors=[("pulp-glue", PULP_CLI_IMPORT_ERR)],
         argument_spec={
             "pulp_href": {},
+            "pulp_hrefs": {"type": "list", "elements": "str"},
+            "task_filter": {
+                "type": "dict",
+                "options": {
+                    "state": {
+                        "type": "list",
+                        "elements": "str",
+                        "choices": [
+                            "waiting",
+                            "skipped",
+                            "running",
+                            "completed",
+                            "failed",
+                            "canceled",
+                            "canceling",
+                        ],
+                    },
+                    "name": {},
+                    "worker": {},
+                    "reserved_resource": {},
+                    "created_before": {},
+                },
+            },
+            "concurrency": {"type": "int", "default": 8},
+            "fail_fast": {"type": "bool", "default": False},
             "state": {
                 "choices": ["absent", "canceled", "completed"],
             },
         },
         required_if=[
             ("state", "absent", ["pulp_href"]),
-            ("state", "canceled", ["pulp_href"]),
-            ("state", "completed", ["pulp_href"]),
+            ("state", "canceled", ["pulp_href", "pulp_hrefs", "task_filter"], True),
+            ("state", "completed", ["pulp_href", "pulp_hrefs", "task_filter"], True),
         ],
+        mutually_exclusive=[("pulp_href", "pulp_hrefs", "task_filter")],
     ) as module:
-        natural_key = {"pulp_href": module.params["pulp_href"]}
-        desired_attributes = {}
+        if module.params["task_filter"] is not None:
+            module.process_tasks(module.select_tasks(module.params["task_filter"]))
+        elif module.params["pulp_hrefs"] is not None:
+            module.process_tasks(module.params["pulp_hrefs"])
+        else:
+            natural_key = {"pulp_href": module.params["pulp_href"]}
+            desired_attributes = {}
 
-        module.process(natural_key, desired_attributes)
+            module.process(natural_key, desired_attributes)
 
 
 if __name__ == "__main__":
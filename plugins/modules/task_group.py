@@ -0,0 +1,146 @@
+#!/usr/bin/python
+
+# copyright (c) 2024, Matthias Dellweg
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+DOCUMENTATION = r"""
+---
+module: task_group
+short_description: Manage task groups of a pulp api server instance
+description:
+  - "This performs list, show and wait operations on task groups in a pulp server."
+  - "Waiting on a task group polls only the group, regardless of the number of tasks in it."
+options:
+  pulp_href:
+    description:
+      - Pulp reference of the task group to query or wait for
+    type: str
+  state:
+    description:
+      - Desired state of the task group.
+      - C(completed) waits until all tasks of the group are dispatched and finished.
+        It fails if any of them failed or was canceled.
+    type: str
+    choices:
+      - completed
+extends_documentation_fragment:
+  - pulp.squeezer.pulp.entity_info
+  - pulp.squeezer.pulp.entity_list
+  - pulp.squeezer.pulp.glue
+  - pulp.squeezer.pulp
+author:
+  - Matthias Dellweg (@mdellweg)
+"""
+
+EXAMPLES = r"""
+- name: Read list of task groups from pulp server
+  pulp.squeezer.task_group:
+    pulp_url: https://pulp.example.org
+    username: admin
+    password: password
+  register: task_group_summary
+- name: Report pulp task groups
+  debug:
+    var: task_group_summary
+
+- name: Wait for all tasks of a task group
+  pulp.squeezer.task_group:
+    pulp_url: https://pulp.example.org
+    username: admin
+    password: password
+    pulp_href: "{{ task_group_href }}"
+    state: completed
+    timeout: 3600
+  register: task_group_result
+- name: Report the number of completed tasks
+  debug:
+    var: task_group_result.summary.completed
+"""
+
+RETURN = r"""
+  task_groups:
+    description: List of task groups
+    type: list
+    returned: when no id is given
+  task_group:
+    description: Task group details
+    type: dict
+    returned: when id is given
+  summary:
+    description: Number of tasks in the task group per state as of the last poll
+    type: dict
+    returned: when state is given
+"""
+
+
+import traceback
+
+from ansible_collections.pulp.squeezer.plugins.module_utils.pulp_glue import (
+    PulpEntityAnsibleModule,
+    SqueezerException,
+    task_group_running,
+)
+
+try:
+    from pulp_glue.common.context import PulpEntityNotFound
+    from pulp_glue.core.context import PulpTaskGroupContext
+
+    PULP_CLI_IMPORT_ERR = None
+except ImportError:
+    PULP_CLI_IMPORT_ERR = traceback.format_exc()
+    PulpTaskGroupContext = None
+
+
+TASK_STATES = ["waiting", "skipped", "running", "completed", "canceled", "failed", "canceling"]
+
+
+def task_group_summary(task_group):
+    return {state: task_group[state] for state in TASK_STATES if state in task_group}
+
+
+class PulpTaskGroupAnsibleModule(PulpEntityAnsibleModule):
+    def process_special(self, desired_attributes, defaults=None):
+        try:
+            entity = self.context.entity
+        except PulpEntityNotFound:
+            raise SqueezerException("Task group not found.")
+        self.set_result("summary", task_group_summary(entity))
+        if task_group_running(entity):
+            if not self.check_mode:
+                self.pulp_ctx.poll_callbacks.append(
+                    lambda task_group: self.set_result("summary", task_group_summary(task_group))
+                )
+                entity = self.pulp_ctx.wait_for_task_group(entity)
+            self.set_changed()
+        elif entity["failed"] + entity["canceled"] > 0:
+            raise SqueezerException(
+                f"Task group {entity['pulp_href']} has failed or canceled tasks."
+            )
+        return entity
+
+
+def main():
+    with PulpTaskGroupAnsibleModule(
+        context_class=PulpTaskGroupContext,
+        entity_singular="task_group",
+        entity_plural="task_groups",
+        import_errors=[("pulp-glue", PULP_CLI_IMPORT_ERR)],
+        argument_spec={
+            "pulp_href": {},
+            "state": {
+                "choices": ["completed"],
+            },
+        },
+        required_if=[
+            ("state", "completed", ["pulp_href"]),
+        ],
+    ) as module:
+        natural_key = {"pulp_href": module.params["pulp_href"]}
+        desired_attributes = {}
+
+        module.process(natural_key, desired_attributes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/python
+
+# copyright (c) 2024, Matthias Dellweg
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+DOCUMENTATION = r"""
+---
+module: task_stats
+short_description: Report duration statistics of tasks on a pulp server
+description:
+  - "This module pages through the tasks on a pulp server and reports per task name statistics on their run time, queue wait and failure rate."
+  - "Only the fields needed are requested from the server and the statistics are aggregated in constant memory regardless of the number of tasks."
+options:
+  name:
+    description:
+      - Only consider tasks with this name.
+    type: str
+  name_contains:
+    description:
+      - Only consider tasks whose name contains this string, e.g. C(synchroniz).
+    type: str
+  finished_after:
+    description:
+      - Only consider tasks that finished after this ISO 8601 timestamp.
+    type: str
+  finished_before:
+    description:
+      - Only consider tasks that finished before this ISO 8601 timestamp.
+    type: str
+  group_by:
+    description:
+      - Aggregate the statistics per task name or per worker.
+    type: str
+    choices:
+      - name
+      - worker
+    default: name
+  percentiles:
+    description:
+      - Percentiles of the run time and queue wait to report.
+    type: list
+    elements: float
+    default: [50, 95, 99]
+extends_documentation_fragment:
+  - pulp.squeezer.pulp.glue
+  - pulp.squeezer.pulp
+author:
+  - Matthias Dellweg (@mdellweg)
+"""
+
+EXAMPLES = r"""
+- name: Report the run time of file syncs over the last week
+  pulp.squeezer.task_stats:
+    pulp_url: https://pulp.example.org
+    username: admin
+    password: password
+    name_contains: synchroniz
+    finished_after: "{{ '%Y-%m-%dT%H:%M:%S+00:00' | strftime(ansible_date_time.epoch | int - 604800, utc=true) }}"
+  register: task_stats_result
+- name: Report the statistics
+  debug:
+    var: task_stats_result.stats
+"""
+
+RETURN = r"""
+  stats:
+    description:
+      - Statistics per task name or worker.
+      - C(count) is the number of tasks and C(states) their number per state.
+      - C(failure_rate) is the share of failed tasks among the finished ones.
+      - C(duration) and C(queue_wait) hold the requested percentiles, C(mean) and C(max) in seconds.
+        The percentiles are accurate to within 1%.
+    type: dict
+    returned: always
+  total:
+    description: Number of tasks considered
+    type: int
+    returned: always
+"""
+
+
+import math
+import traceback
+
+from ansible_collections.pulp.squeezer.plugins.module_utils.keyset import (
+    KEYSET_FIELD,
+    keyset_supported,
+)
+from ansible_collections.pulp.squeezer.plugins.module_utils.pulp_glue import (
+    PulpAnsibleModule,
+    SqueezerException,
+    keyset_list_iterator,
+    list_query_params,
+    parse_datetime,
+)
+
+try:
+    from pulp_glue.core.context import PulpTaskContext
+
+    PULP_CLI_IMPORT_ERR = None
+except ImportError:
+    PULP_CLI_IMPORT_ERR = traceback.format_exc()
+
+
+FIELDS = ["name", "state", "pulp_created", "started_at", "finished_at", "worker"]
+FINISHED_STATES = ["completed", "failed", "canceled", "skipped"]
+
+
+class Histogram:
+    """
+    Streaming summary of non negative values in logarithmic buckets.
+
+    Memory depends only on the range of the values, not their number.
+    Reported percentiles are within the relative `precision` of the true value.
+    """
+
+    def __init__(self, precision=0.01):
+        self.base = math.log1p(2 * precision)
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        value = max(value, 0.0)
+        # Values below a millisecond share one bucket.
+        key = math.floor(math.log(max(value, 0.001)) / self.base)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percent):
+        rank = percent / 100 * self.count
+        seen = 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen >= rank:
+                # The center of the bucket.
+                return min(math.exp((key + 0.5) * self.base), self.max)
+        return self.max
+
+    def summary(self, percentiles):
+        if not self.count:
+            return {}
+        result = {f"p{percent:g}": round(self.percentile(percent), 3) for percent in percentiles}
+        result["mean"] = round(self.total / self.count, 3)
+        result["max"] = round(self.max, 3)
+        return result
+
+
+class TaskStats:
+    def __init__(self):
+        self.count = 0
+        self.states = {}
+        self.duration = Histogram()
+        self.queue_wait = Histogram()
+
+    def add(self, task):
+        self.count += 1
+        self.states[task["state"]] = self.states.get(task["state"], 0) + 1
+        created = parse_timestamp(task["pulp_created"])
+        started = parse_timestamp(task["started_at"])
+        finished = parse_timestamp(task["finished_at"])
+        if started is not None:
+            self.queue_wait.add((started - created).total_seconds())
+            if finished is not None:
+                self.duration.add((finished - started).total_seconds())
+
+    def summary(self, percentiles):
+        finished = sum(self.states.get(state, 0) for state in FINISHED_STATES)
+        return {
+            "count": self.count,
+            "states": self.states,
+            "failure_rate": round(self.states.get("failed", 0) / finished, 4) if finished else None,
+            "duration": self.duration.summary(percentiles),
+            "queue_wait": self.queue_wait.summary(percentiles),
+        }
+
+
+def parse_timestamp(value):
+    if value is None:
+        return None
+    return parse_datetime(value)
+
+
+def main():
+    with PulpAnsibleModule(
+        import_errors=[("pulp-glue", PULP_CLI_IMPORT_ERR)],
+        argument_spec={
+            "name": {},
+            "name_contains": {},
+            "finished_after": {},
+            "finished_before": {},
+            "group_by": {"choices": ["name", "worker"], "default": "name"},
+            "percentiles": {"type": "list", "elements": "float", "default": [50, 95, 99]},
+        },
+    ) as module:
+        task_ctx = PulpTaskContext(module.pulp_ctx)
+        parameters = {"fields": FIELDS}
+        for param, query in [
+            ("name", "name"),
+            ("name_contains", "name__contains"),
+        ]:
+            if module.params[param] is not None:
+                parameters[query] = module.params[param]
+        for param, query in [
+            ("finished_after", "finished_at__gte"),
+            ("finished_before", "finished_at__lt"),
+        ]:
+            if module.params[param] is not None:
+                try:
+                    parameters[query] = parse_datetime(module.params[param])
+                except ValueError:
+                    raise SqueezerException("{0} must be an ISO 8601 timestamp.".format(param))
+
+        if keyset_supported(list_query_params(task_ctx)):
+            tasks = keyset_list_iterator(task_ctx, parameters)
+        else:
+            if "ordering" in list_query_params(task_ctx):
+                # Tasks created while paging are appended at the end and do not shift the offsets.
+                parameters["ordering"] = [KEYSET_FIELD]
+            tasks = task_ctx.list_iterator(parameters=parameters)
+
+        stats = {}
+        total = 0
+        for task in tasks:
+            key = task[module.params["group_by"]] or ""
+            if key not in stats:
+                stats[key] = TaskStats()
+            stats[key].add(task)
+            total += 1
+
+        module.set_result(
+            "stats",
+            {key: value.summary(module.params["percentiles"]) for key, value in stats.items()},
+        )
+        module.set_result("total", total)
+
+
+if __name__ == "__main__":
+    main()
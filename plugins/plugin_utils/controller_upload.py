@@ -0,0 +1,180 @@
+# copyright (c) 2024, Matthias Dellweg
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+import os
+from abc import abstractmethod
+
+from ansible.errors import AnsibleError
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.plugins.action import ActionBase
+from ansible_collections.pulp.squeezer.plugins.module_utils.digest_cache import DigestCache
+from ansible_collections.pulp.squeezer.plugins.module_utils.pulp_glue import (
+    PULP_CLI_IMPORT_ERR,
+    SqueezerException,
+    create_pulp_context,
+    upload_artifact,
+    upload_chunk_size,
+    upload_rate_limit,
+)
+from ansible_collections.pulp.squeezer.plugins.module_utils.upload import (
+    UPLOAD_ARGUMENT_SPEC,
+    locked_upload,
+    lookup_sha256,
+    upload_options,
+)
+
+try:
+    from pulp_glue.common.context import PulpException
+    from pulp_glue.core.context import PulpArtifactContext
+except ImportError:
+    PulpException = None
+
+
+def connection_params(args):
+    """
+    Collect the parameters to connect to the pulp server like the modules do, but on the controller.
+    """
+    return {
+        "pulp_url": args.get("pulp_url") or os.environ.get("SQUEEZER_PULP_URL"),
+        "username": args.get("username") or os.environ.get("SQUEEZER_USERNAME"),
+        "password": args.get("password") or os.environ.get("SQUEEZER_PASSWORD"),
+        "user_cert": args.get("user_cert"),
+        "user_key": args.get("user_key"),
+        "validate_certs": boolean(
+            args.get("validate_certs", os.environ.get("SQUEEZER_VALIDATE_CERTS", True))
+        ),
+        "refresh_api_cache": boolean(args.get("refresh_api_cache", False)),
+        "timeout": int(args.get("timeout", 10)),
+    }
+
+
+def upload_params(args):
+    """
+    Apply the types and defaults of the upload options to the task arguments.
+    """
+    result = ArgumentSpecValidator(UPLOAD_ARGUMENT_SPEC).validate(
+        {key: value for key, value in args.items() if key in UPLOAD_ARGUMENT_SPEC}
+    )
+    if result.error_messages:
+        raise AnsibleError(" ".join(result.error_messages))
+    return result.validated_parameters
+
+
+class ControllerUploadAction(ActionBase):
+    """
+    Action for modules taking a `file` to upload, that can read it from the controller.
+
+    With `remote_src: false`, the file is looked up on the controller and uploaded from there as
+    an artifact. The module then runs on the managed node with `module_args` instead of the file.
+    For other states than present, the module gets the digest of the file instead.
+    Otherwise the module is run unchanged.
+    """
+
+    @abstractmethod
+    def module_args(self, args, sha256, artifact_href):
+        """
+        Return the arguments for the module once the file is present as the artifact
+        `artifact_href` with the digest `sha256`.
+        """
+
+    def run(self, tmp=None, task_vars=None):
+        result = super().run(tmp, task_vars)
+        args = self._task.args.copy()
+        if boolean(args.get("remote_src", True)) or not args.get("file"):
+            result.update(self._execute_module(module_args=args, task_vars=task_vars))
+            return result
+
+        if args.get("state") != "present":
+            # The file is not available on the managed node.
+            try:
+                path = self._find_needle("files", args["file"])
+                module_args = dict(args, sha256=self._sha256(path, args))
+            except (AnsibleError, IOError, OSError) as e:
+                result["failed"] = True
+                result["msg"] = str(e)
+                return result
+            module_args.pop("file")
+            result.update(self._execute_module(module_args=module_args, task_vars=task_vars))
+            return result
+
+        if PulpException is None:
+            result["failed"] = True
+            result["msg"] = "Uploading from the controller needs pulp-glue on the controller."
+            result["exception"] = PULP_CLI_IMPORT_ERR
+            return result
+
+        try:
+            path = self._find_needle("files", args["file"])
+            artifact, changed = self._upload(path, args)
+        except (AnsibleError, PulpException, SqueezerException, IOError, OSError) as e:
+            result["failed"] = True
+            result["msg"] = str(e)
+            return result
+
+        if artifact is None:
+            # In check mode, the content cannot exist without the artifact.
+            result["changed"] = True
+            return result
+
+        module_args = self.module_args(args, *artifact)
+        result.update(self._execute_module(module_args=module_args, task_vars=task_vars))
+        result["changed"] = result.get("changed", False) or changed
+        return result
+
+    def _sha256(self, path, args):
+        """
+        Return the digest to look up the file at `path` by.
+        """
+        digest_cache = DigestCache() if upload_params(args)["digest_cache"] else None
+        sha256 = lookup_sha256(path, args.get("sha256"), digest_cache)
+        if digest_cache is not None:
+            digest_cache.save()
+        return sha256
+
+    def _upload(self, path, args):
+        """
+        Make sure the file is present as artifact.
+
+        Returns the digest and href of the artifact, or None in check mode if it is missing,
+        and whether it was uploaded.
+        """
+        params = dict(connection_params(args), **upload_params(args))
+        pulp_ctx = create_pulp_context(params, fake_mode=self._play_context.check_mode)
+
+        sha256 = self._sha256(path, args)
+
+        artifact_ctx = PulpArtifactContext(pulp_ctx)
+
+        def _find():
+            artifacts = artifact_ctx.list(limit=1, offset=0, parameters={"sha256": sha256})
+            return (sha256, artifacts[0]["pulp_href"]) if artifacts else None
+
+        found = _find()
+        if found is not None:
+            return found, False
+        if self._play_context.check_mode:
+            return None, True
+
+        options = upload_options(
+            params, sha256, upload_chunk_size(params), upload_rate_limit(params)
+        )
+
+        def _upload_artifact():
+            return sha256, upload_artifact(
+                pulp_ctx,
+                path,
+                sha256,
+                options["chunk_size"],
+                concurrency=options["upload_concurrency"],
+                retries=options["upload_retries"],
+                resumable=options["resumable"],
+                rate_limit=options["rate_limit"],
+            )
+
+        return locked_upload(options["upload_lock"], _find, _upload_artifact)
@@ -7,7 +7,10 @@ import pytest
 
 TEST_NAMES = [name[:-5] for name in os.listdir("tests/playbooks") if name.endswith(".yaml")]
 
-IGNORED_WARNINGS = []
+IGNORED_WARNINGS = [
+    # Servers before pulp_created__gte was offered on the tasks.
+    "Keyset pagination is not supported for tasks; falling back to offset.",
+]
 
 
 # Clean environment from anything that could cause encoding problems
@@ -0,0 +1,16 @@
+import os
+import sys
+import types
+
+# Import the collection straight from the source tree as `ansible_collections.pulp.squeezer`.
+COLLECTION_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+for name, path in [
+    ("ansible_collections", None),
+    ("ansible_collections.pulp", None),
+    ("ansible_collections.pulp.squeezer", COLLECTION_ROOT),
+]:
+    if name not in sys.modules:
+        module = types.ModuleType(name)
+        module.__path__ = [path] if path else []
+        sys.modules[name] = module
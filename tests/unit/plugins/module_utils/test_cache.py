@@ -0,0 +1,13 @@
+import os
+
+from ansible_collections.pulp.squeezer.plugins.module_utils.cache import cache_dir
+
+
+def test_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert cache_dir("locks") == str(tmp_path / "squeezer" / "locks")
+
+
+def test_cache_dir_default(monkeypatch):
+    monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+    assert cache_dir() == os.path.expanduser(os.path.join("~", ".cache", "squeezer"))
@@ -0,0 +1,103 @@
+import os
+import time
+
+import pytest
+from ansible_collections.pulp.squeezer.plugins.module_utils.digest_cache import DigestCache
+
+
+class Compute:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, path):
+        self.calls.append(path)
+        with open(path, "rb") as f:
+            return "digest-" + f.read().decode()
+
+
+def write(path, content, age=60):
+    path.write_text(content)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "cache" / "digests.json")
+
+
+def cached_sha256(cache_path, path, compute):
+    cache = DigestCache(cache_path)
+    digest = cache.sha256(path, compute)
+    cache.save()
+    return digest
+
+
+def test_cache_hit(tmp_path, cache_path):
+    path = write(tmp_path / "a", "a")
+    compute = Compute()
+    assert cached_sha256(cache_path, path, compute) == "digest-a"
+    # A new instance reads the saved entry.
+    assert cached_sha256(cache_path, path, compute) == "digest-a"
+    assert compute.calls == [path]
+
+
+def test_cache_miss_after_change(tmp_path, cache_path):
+    path = write(tmp_path / "a", "a")
+    compute = Compute()
+    cache = DigestCache(cache_path)
+    cache.sha256(path, compute)
+    write(tmp_path / "a", "b", age=30)
+    assert cache.sha256(path, compute) == "digest-b"
+    assert len(compute.calls) == 2
+
+
+def test_recently_modified_file_is_not_cached(tmp_path, cache_path):
+    path = write(tmp_path / "a", "a", age=0)
+    compute = Compute()
+    cache = DigestCache(cache_path)
+    cache.sha256(path, compute)
+    cache.sha256(path, compute)
+    assert len(compute.calls) == 2
+
+
+def test_save(tmp_path, cache_path):
+    path = write(tmp_path / "a", "a")
+    cache = DigestCache(cache_path)
+    cache.sha256(path, Compute())
+    assert not os.path.exists(cache_path)
+    cache.save()
+    compute = Compute()
+    DigestCache(cache_path).sha256(path, compute)
+    assert compute.calls == []
+
+
+def test_cache_hits_are_not_saved(tmp_path, cache_path):
+    path = write(tmp_path / "a", "a")
+    cached_sha256(cache_path, path, Compute())
+    os.utime(cache_path, (0, 0))
+    cached_sha256(cache_path, path, Compute())
+    assert os.stat(cache_path).st_mtime == 0
+
+
+def test_eviction(tmp_path, cache_path):
+    cache = DigestCache(cache_path, max_entries=2)
+    paths = [write(tmp_path / name, name) for name in "abc"]
+    for path in paths:
+        cache.sha256(path, Compute())
+        # Keep the usage times apart.
+        time.sleep(0.01)
+    cache.save()
+    compute = Compute()
+    for path in paths:
+        DigestCache(cache_path).sha256(path, compute)
+    assert compute.calls == [paths[0]]
+
+
+def test_corrupt_cache(tmp_path, cache_path):
+    os.makedirs(os.path.dirname(cache_path))
+    with open(cache_path, "w") as f:
+        f.write("{not json")
+    path = write(tmp_path / "a", "a")
+    assert cached_sha256(cache_path, path, Compute()) == "digest-a"
@@ -0,0 +1,64 @@
+import pytest
+from ansible_collections.pulp.squeezer.plugins.module_utils.openapi import (
+    FileSlice,
+    MultipartBody,
+    OpenAPI,
+)
+
+DATA = bytes(range(256)) * 1000
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    path = tmp_path / "file.dat"
+    path.write_bytes(DATA)
+    return str(path)
+
+
+def read_all(body, size):
+    blocks = []
+    while True:
+        block = body.read(size)
+        if not block:
+            return b"".join(blocks)
+        assert size < 0 or len(block) <= size
+        blocks.append(block)
+
+
+def test_file_slice(data_path):
+    file_slice = FileSlice(data_path, offset=1000, length=70000)
+    assert len(file_slice) == 70000
+    assert b"".join(file_slice.blocks(4096)) == DATA[1000:71000]
+    assert len(FileSlice(data_path, offset=1000)) == len(DATA) - 1000
+
+
+def test_file_slice_truncated(data_path):
+    file_slice = FileSlice(data_path)
+    with open(data_path, "r+b") as f:
+        f.truncate(1000)
+    with pytest.raises(IOError):
+        b"".join(file_slice.blocks(4096))
+
+
+@pytest.mark.parametrize("size", [-1, 1, 7, 4096, MultipartBody.BLOCK_SIZE + 1])
+def test_multipart_body(data_path, size):
+    parts = [b"--boundary", b"header", b"", FileSlice(data_path, 5, 100000), b"--boundary--"]
+    expected = b"\r\n".join([b"--boundary", b"header", b"", DATA[5:100005], b"--boundary--"])
+    body = MultipartBody(parts)
+    assert len(body) == len(expected)
+    assert read_all(body, size) == expected
+
+
+def test_render_body_content_length(data_path):
+    api = OpenAPI.__new__(OpenAPI)
+    api.openapi_version = 3
+    method_spec = {"requestBody": {"content": {"multipart/form-data": {}}}}
+    headers = {}
+    data = api.render_body(
+        {}, method_spec, headers, body={"size": 300}, uploads={"file": FileSlice(data_path)}
+    )
+    content = read_all(data, 8192)
+    assert headers["Content-Length"] == len(content)
+    assert headers["Content-Type"].startswith("multipart/form-data; boundary=")
+    assert DATA in content
+    assert b'name="size"\r\n\r\n300\r\n' in content
@@ -0,0 +1,76 @@
+import itertools
+
+import pytest
+from ansible_collections.pulp.squeezer.plugins.module_utils import polling
+from ansible_collections.pulp.squeezer.plugins.module_utils.polling import (
+    PollingPolicy,
+    QueueTimeout,
+    wait_for_queue,
+)
+
+
+def test_intervals_grow_to_the_cap():
+    policy = PollingPolicy(initial_interval=0.1, max_interval=1.0, factor=2.0, jitter=0)
+    intervals = list(itertools.islice(policy.intervals(), 6))
+    assert intervals == pytest.approx([0.1, 0.2, 0.4, 0.8, 1.0, 1.0])
+
+
+def test_intervals_jitter():
+    policy = PollingPolicy(initial_interval=1.0, max_interval=100.0, factor=2.0, jitter=0.2)
+    for _ in range(100):
+        intervals = list(itertools.islice(policy.intervals(), 3))
+        for interval, base in zip(intervals, [1.0, 2.0, 4.0]):
+            assert base * 0.8 <= interval <= base * 1.2
+
+
+def test_intervals_jitter_keeps_the_cap():
+    policy = PollingPolicy(initial_interval=1.0, max_interval=1.0, jitter=0.5)
+    assert all(interval <= 1.0 for interval in itertools.islice(policy.intervals(), 100))
+
+
+@pytest.mark.parametrize(
+    "initial_interval,max_interval",
+    [(0, 1.0), (-1.0, 1.0), (2.0, 1.0)],
+)
+def test_invalid_intervals(initial_interval, max_interval):
+    with pytest.raises(ValueError):
+        PollingPolicy(initial_interval=initial_interval, max_interval=max_interval)
+
+
+class Queue:
+    def __init__(self, waiting, workers=2):
+        self.waiting = list(waiting)
+        self.workers = workers
+        self.calls = []
+
+    def call(self, operation_id, parameters=None):
+        self.calls.append(operation_id)
+        if operation_id == "tasks_list":
+            assert parameters["state"] == "waiting"
+            return {"count": self.waiting.pop(0)}
+        return {"count": self.workers}
+
+
+def test_wait_for_queue(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(polling.time, "sleep", sleeps.append)
+    queue = Queue([10, 5, 3])
+    wait_for_queue(queue.call, 2)
+    assert queue.waiting == []
+    assert len(sleeps) == 2
+
+
+def test_wait_for_queue_without_workers(monkeypatch):
+    monkeypatch.setattr(polling.time, "sleep", lambda seconds: None)
+    queue = Queue([1], workers=0)
+    wait_for_queue(queue.call, 2)
+    assert queue.calls == ["tasks_list", "workers_list"]
+
+
+def test_wait_for_queue_timeout(monkeypatch):
+    clock = iter(itertools.count(0, 10))
+    monkeypatch.setattr(polling.time, "time", lambda: next(clock))
+    monkeypatch.setattr(polling.time, "sleep", lambda seconds: None)
+    queue = Queue([10] * 10)
+    with pytest.raises(QueueTimeout, match="10 tasks waiting for 2 workers"):
+        wait_for_queue(queue.call, 1, timeout=15)
@@ -0,0 +1,196 @@
+import bisect
+import datetime
+import random
+
+import pytest
+from ansible_collections.pulp.squeezer.plugins.module_utils.pulp_glue import (
+    SqueezerException,
+    SqueezerPulpContext,
+    keyset_list_iterator,
+    parse_datetime,
+    task_group_running,
+)
+from ansible_collections.pulp.squeezer.plugins.module_utils.resumable import ResumableTask
+from pulp_glue.common.context import PulpContext, PulpException
+
+TASK_HREF = "/pulp/api/v3/tasks/0123/"
+ISO_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+
+class StandInContext:
+    """
+    In-memory stand-in for a list endpoint backed by an index on pulp_created.
+
+    Rows sharing a creation time come back in random order, as a database does not order ties.
+    `rows_read` records per page how many rows the database had to read, including the ones
+    skipped by the offset.
+    """
+
+    ENTITIES = "tasks"
+    scope = {}
+
+    def __init__(self, entities, seed=0):
+        self.entities = sorted(entities, key=lambda entity: entity["pulp_created"])
+        self.created = [entity["pulp_created"] for entity in self.entities]
+        self.random = random.Random(seed)
+        self.rows_read = []
+
+    def call(self, operation_id, parameters):
+        assert operation_id == "list"
+        assert parameters.get("ordering") in (None, ["pulp_created"])
+        start = 0
+        if "pulp_created__gte" in parameters:
+            # pulp-glue only accepts datetimes for date-time parameters.
+            boundary = parameters["pulp_created__gte"]
+            assert isinstance(boundary, datetime.datetime)
+            start = bisect.bisect_left(self.created, boundary.strftime(ISO_DATETIME_FORMAT))
+        rows = self.entities[start:]
+        # Shuffle the ties.
+        rows = sorted(rows, key=lambda entity: (entity["pulp_created"], self.random.random()))
+        offset, limit = parameters["offset"], parameters["limit"]
+        page = rows[offset : offset + limit]
+        self.rows_read.append(offset + len(page))
+        fields = parameters.get("fields")
+        return {
+            "count": len(rows),
+            "next": "more" if offset + limit < len(rows) else None,
+            "results": [
+                {key: entity[key] for key in fields} if fields else dict(entity) for entity in page
+            ],
+        }
+
+
+def make_entities(count, ties=1):
+    return [
+        {
+            "pulp_href": f"/pulp/api/v3/tasks/{i:06d}/",
+            "pulp_created": (
+                datetime.datetime(2024, 1, 1) + datetime.timedelta(seconds=i // ties)
+            ).strftime(ISO_DATETIME_FORMAT),
+            "name": "sync",
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def resumable(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    resumable = ResumableTask("https://pulp.example.org", "file_sync", {"repository": "test"})
+    resumable.save("repositories_file_file_sync", TASK_HREF)
+    return resumable
+
+
+@pytest.fixture
+def pulp_ctx():
+    return SqueezerPulpContext(api_root="/pulp/", api_kwargs={})
+
+
+def serve_task(monkeypatch, state):
+    def _call(self, operation_id, parameters=None, **kwargs):
+        assert operation_id == "tasks_read"
+        if state is None:
+            raise PulpException("Not found.")
+        return {"pulp_href": parameters["task_href"], "state": state}
+
+    monkeypatch.setattr(PulpContext, "call", _call)
+
+
+@pytest.mark.parametrize("state", ["waiting", "running", "canceling"])
+def test_resume_unfinished_task(monkeypatch, pulp_ctx, resumable, state):
+    serve_task(monkeypatch, state)
+    task = pulp_ctx._resume(resumable, "repositories_file_file_sync")
+    assert task == {"pulp_href": TASK_HREF, "state": state}
+    assert resumable.load() == []
+
+
+@pytest.mark.parametrize("state", ["completed", "failed", "canceled", "skipped", None])
+def test_resume_finished_task(monkeypatch, pulp_ctx, resumable, state):
+    serve_task(monkeypatch, state)
+    assert pulp_ctx._resume(resumable, "repositories_file_file_sync") is None
+    assert resumable.load() == []
+
+
+def test_resume_other_operation(monkeypatch, pulp_ctx, resumable):
+    serve_task(monkeypatch, "running")
+    assert pulp_ctx._resume(resumable, "repositories_file_file_modify") is None
+    assert resumable.pop("repositories_file_file_sync") == TASK_HREF
+
+
+def test_resume_every_recorded_task(monkeypatch, pulp_ctx, resumable):
+    other_href = "/pulp/api/v3/tasks/4567/"
+    resumable.save("publications_file_file_create", other_href)
+    resumable.save("repositories_file_file_sync", other_href)
+    serve_task(monkeypatch, "running")
+    assert pulp_ctx._resume(resumable, "publications_file_file_create")["pulp_href"] == other_href
+    assert pulp_ctx._resume(resumable, "repositories_file_file_sync")["pulp_href"] == TASK_HREF
+    assert pulp_ctx._resume(resumable, "repositories_file_file_sync")["pulp_href"] == other_href
+    assert pulp_ctx._resume(resumable, "repositories_file_file_sync") is None
+    assert resumable.load() == []
+
+
+@pytest.mark.parametrize("ties", [1, 3, 10])
+def test_keyset_list_ties(ties):
+    entities = make_entities(1000, ties=ties)
+    context = StandInContext(entities)
+    hrefs = [entity["pulp_href"] for entity in keyset_list_iterator(context, batch_size=25)]
+    assert sorted(hrefs) == [entity["pulp_href"] for entity in entities]
+
+
+def test_keyset_list_too_many_ties():
+    context = StandInContext(make_entities(100, ties=50))
+    with pytest.raises(SqueezerException):
+        list(keyset_list_iterator(context, batch_size=25))
+
+
+def test_keyset_list_projection():
+    context = StandInContext(make_entities(100, ties=3))
+    entities = list(keyset_list_iterator(context, {"fields": ["name"]}, batch_size=25))
+    assert len(entities) == 100
+    assert set(entities[0]) == {"name", "pulp_href", "pulp_created"}
+
+
+def test_keyset_list_rows_read_per_page():
+    # Reading a page costs the same at the end of a large collection as at the start.
+    context = StandInContext(make_entities(10000, ties=3))
+    assert len(list(keyset_list_iterator(context, batch_size=100))) == 10000
+    assert max(context.rows_read) == 100
+    # Every page repeats the entities sharing the boundary timestamp, so a few more are needed.
+    assert len(context.rows_read) < 110
+
+    # Offset pagination reads all skipped rows again.
+    offset_context = StandInContext(make_entities(10000, ties=3))
+    for offset in range(0, 10000, 100):
+        offset_context.call("list", {"offset": offset, "limit": 100})
+    assert offset_context.rows_read[-1] == 10000
+
+
+@pytest.mark.parametrize(
+    "task_group,running",
+    [
+        ({"waiting": 0, "running": 0, "canceling": 0}, False),
+        ({"waiting": 0, "running": 0, "canceling": 0, "all_tasks_dispatched": True}, False),
+        ({"waiting": 0, "running": 0, "canceling": 0, "all_tasks_dispatched": False}, True),
+        ({"waiting": 1, "running": 0, "canceling": 0}, True),
+        ({"waiting": 0, "running": 0, "canceling": 1}, True),
+    ],
+)
+def test_task_group_running(task_group, running):
+    assert task_group_running(task_group) is running
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        (
+            "2024-01-01T00:00:00.000001Z",
+            datetime.datetime(2024, 1, 1, 0, 0, 0, 1, datetime.timezone.utc),
+        ),
+        ("2024-01-01T02:00:00+02:00", datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)),
+        ("2024-01-01T00:00:00", datetime.datetime(2024, 1, 1)),
+    ],
+)
+def test_parse_datetime(value, expected):
+    timestamp = parse_datetime(value)
+    assert timestamp == expected
+    assert timestamp.utcoffset() == expected.utcoffset()
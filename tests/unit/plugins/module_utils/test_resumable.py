@@ -0,0 +1,70 @@
+import pytest
+from ansible_collections.pulp.squeezer.plugins.module_utils.resumable import ResumableUpload
+
+BASE_URL = "https://pulp.example.org"
+UPLOAD_HREF = "/pulp/api/v3/uploads/0123/"
+SHA256 = "0" * 64
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+
+def recorded_upload(size=2500, chunk_size=1000, ranges=()):
+    resumable = ResumableUpload(BASE_URL, SHA256)
+    resumable.save(UPLOAD_HREF, size, chunk_size)
+    for offset, length in ranges:
+        resumable.acknowledge(offset, length)
+    return ResumableUpload(BASE_URL, SHA256)
+
+
+def test_resume_nothing_recorded():
+    resumable = ResumableUpload(BASE_URL, SHA256)
+    assert resumable.resume(1000, lambda href: pytest.fail("No upload to read.")) == (None, set())
+
+
+def test_resume_local_ranges():
+    resumable = recorded_upload(ranges=[(0, 1000), (2000, 500)])
+    assert resumable.resume(1000, lambda href: {"pulp_href": href}) == (UPLOAD_HREF, {0, 2000})
+
+
+def test_resume_server_chunks_take_precedence():
+    resumable = recorded_upload(ranges=[(0, 1000), (1000, 1000)])
+    upload = {"pulp_href": UPLOAD_HREF, "chunks": [{"offset": 1000, "size": 1000}]}
+    assert resumable.resume(1000, lambda href: upload) == (UPLOAD_HREF, {1000})
+
+
+def test_resume_skips_partial_chunks():
+    resumable = recorded_upload()
+    upload = {
+        "pulp_href": UPLOAD_HREF,
+        "chunks": [
+            {"offset": 0, "size": 600},
+            {"offset": 1500, "size": 1000},
+            {"offset": 2000, "size": 500},
+        ],
+    }
+    assert resumable.resume(1000, lambda href: upload) == (UPLOAD_HREF, {2000})
+
+
+@pytest.mark.parametrize(
+    "chunk_size,upload",
+    [
+        (2000, {"pulp_href": UPLOAD_HREF}),
+        (1000, None),
+        (1000, {"pulp_href": UPLOAD_HREF, "completed": "2024-01-01T00:00:00Z"}),
+    ],
+    ids=["other_chunk_size", "upload_gone", "upload_completed"],
+)
+def test_resume_starts_over(chunk_size, upload):
+    resumable = recorded_upload(ranges=[(0, 1000)])
+    assert resumable.resume(chunk_size, lambda href: upload) == (None, set())
+    assert resumable.load() is None
+
+
+def test_acknowledge_after_resume():
+    resumable = recorded_upload(ranges=[(0, 1000)])
+    resumable.resume(1000, lambda href: {"pulp_href": href})
+    resumable.acknowledge(1000, 1000)
+    assert ResumableUpload(BASE_URL, SHA256).load()["ranges"] == [[0, 1000], [1000, 1000]]
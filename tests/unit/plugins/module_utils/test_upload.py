@@ -0,0 +1,330 @@
+import hashlib
+import re
+import threading
+import time
+
+import pytest
+from ansible_collections.pulp.squeezer.plugins.module_utils import upload
+from ansible_collections.pulp.squeezer.plugins.module_utils.upload import (
+    MIB,
+    AdaptiveChunkSize,
+    RateLimit,
+    chunk_size_from_param,
+    file_sha256,
+    locked_upload,
+    lookup_sha256,
+    rate_limit_from_param,
+    upload_chunks,
+    upload_options,
+)
+from ansible_collections.pulp.squeezer.plugins.module_utils.upload_lock import UploadLock
+
+
+def test_file_sha256(tmp_path):
+    data = b"squeezer" * (MIB // 4)
+    path = tmp_path / "file.dat"
+    path.write_bytes(data)
+    assert file_sha256(str(path)) == hashlib.sha256(data).hexdigest()
+
+
+def test_lookup_sha256(tmp_path):
+    path = tmp_path / "file.dat"
+    path.write_bytes(b"squeezer")
+    assert lookup_sha256(str(path)) == hashlib.sha256(b"squeezer").hexdigest()
+    assert lookup_sha256(str(path), "0" * 64) == "0" * 64
+
+
+def test_lookup_sha256_digest_cache(tmp_path):
+    class Cache:
+        def sha256(self, path, compute):
+            return "cached"
+
+    path = tmp_path / "file.dat"
+    path.write_bytes(b"squeezer")
+    assert lookup_sha256(str(path), digest_cache=Cache()) == "cached"
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(upload.time, "sleep", lambda seconds: None)
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    data = bytes(range(256)) * 40
+    path = tmp_path / "file.dat"
+    path.write_bytes(data)
+    return str(path), data
+
+
+class Receiver:
+    """
+    Server side of a chunked upload, failing the chunks at the offsets in `failures` as often
+    as given there.
+    """
+
+    def __init__(self, failures=None):
+        self.failures = dict(failures or {})
+        self.chunks = {}
+        self.attempts = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, chunk, offset):
+        with self._lock:
+            self.attempts.append(offset)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(0.001)
+            with self._lock:
+                if self.failures.get(offset):
+                    self.failures[offset] -= 1
+                    raise IOError(f"Chunk at {offset} failed.")
+                self.chunks[offset] = chunk
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def data(self):
+        return b"".join(self.chunks[offset] for offset in sorted(self.chunks))
+
+
+def test_upload_chunks(data_file):
+    path, data = data_file
+    receiver = Receiver()
+    digest = upload_chunks(path, 1000, receiver, concurrency=3)
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert sorted(receiver.chunks) == list(range(0, len(data), 1000))
+    assert receiver.data() == data
+    assert 1 <= receiver.max_in_flight <= 3
+
+
+def test_upload_chunks_retries(no_sleep, data_file):
+    path, data = data_file
+    receiver = Receiver(failures={2000: 2, 7000: 1})
+    upload_chunks(path, 1000, receiver, concurrency=2, retries=2)
+    assert receiver.data() == data
+    assert receiver.attempts.count(2000) == 3
+    assert receiver.attempts.count(7000) == 2
+
+
+def test_upload_chunks_fails_after_retries(no_sleep, data_file):
+    path, data = data_file
+    receiver = Receiver(failures={3000: 3})
+    with pytest.raises(IOError, match="Chunk at 3000 failed."):
+        upload_chunks(path, 1000, receiver, concurrency=2, retries=2)
+    assert receiver.attempts.count(3000) == 3
+
+
+def test_upload_chunks_failure_without_cancel_futures(monkeypatch, no_sleep, data_file):
+    class Executor(upload.ThreadPoolExecutor):
+        # Python 3.8 does not know about cancel_futures.
+        def shutdown(self, wait=True):
+            super().shutdown(wait=wait)
+
+    monkeypatch.setattr(upload, "ThreadPoolExecutor", Executor)
+    path, data = data_file
+    receiver = Receiver(failures={0: 1})
+    with pytest.raises(IOError, match="Chunk at 0 failed."):
+        upload_chunks(path, 1000, receiver, concurrency=1, retries=0)
+    assert len(receiver.attempts) < len(data) // 1000
+
+
+def test_upload_chunks_empty_file(tmp_path):
+    path = tmp_path / "empty.dat"
+    path.write_bytes(b"")
+    receiver = Receiver()
+    assert upload_chunks(str(path), 1000, receiver) == hashlib.sha256(b"").hexdigest()
+    assert receiver.chunks == {}
+
+
+def test_upload_chunks_skips_acknowledged(data_file):
+    path, data = data_file
+    receiver = Receiver()
+    digest = upload_chunks(path, 1000, receiver, acknowledged={0, 3000, 10000})
+    # The digest covers the whole file.
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert sorted(receiver.attempts) == [
+        offset for offset in range(0, len(data), 1000) if offset not in (0, 3000, 10000)
+    ]
+
+
+@pytest.mark.parametrize("value,expected", [(1000, 1000), ("1000", 1000)])
+def test_chunk_size_from_param(value, expected):
+    assert chunk_size_from_param(value) == expected
+
+
+def test_chunk_size_from_param_auto():
+    assert isinstance(chunk_size_from_param("auto"), AdaptiveChunkSize)
+
+
+@pytest.mark.parametrize(
+    "value,message",
+    [
+        (0, "chunk_size must be positive."),
+        (-1000, "chunk_size must be positive."),
+        ("large", "chunk_size must be a number of bytes or 'auto'."),
+        (None, "chunk_size must be a number of bytes or 'auto'."),
+    ],
+)
+def test_chunk_size_from_param_invalid(value, message):
+    with pytest.raises(ValueError, match=re.escape(message)):
+        chunk_size_from_param(value)
+
+
+def test_adaptive_chunk_size():
+    chunk_size = AdaptiveChunkSize(initial=8 * MIB, min_size=1 * MIB, max_size=64 * MIB)
+    assert chunk_size.next_size() == 8 * MIB
+    # Fast chunks at most double the size.
+    chunk_size.record(8 * MIB, 0.1)
+    assert int(chunk_size) == 16 * MIB
+    # Slow chunks at most halve it.
+    chunk_size.record(16 * MIB, 100.0)
+    assert int(chunk_size) == 8 * MIB
+    # The size settles where a chunk takes target_seconds.
+    chunk_size.record(8 * MIB, 4.0)
+    assert int(chunk_size) == 10 * MIB
+    chunk_size.failed()
+    assert int(chunk_size) == 5 * MIB
+    # The short last chunk of a file is ignored.
+    chunk_size.record(MIB // 2, 100.0)
+    assert int(chunk_size) == 5 * MIB
+
+
+def test_adaptive_chunk_size_limits():
+    chunk_size = AdaptiveChunkSize(initial=2 * MIB, min_size=1 * MIB, max_size=4 * MIB)
+    for _ in range(5):
+        chunk_size.record(int(chunk_size), 0.001)
+    assert int(chunk_size) == 4 * MIB
+    for _ in range(5):
+        chunk_size.failed()
+    assert int(chunk_size) == 1 * MIB
+
+
+def test_adaptive_chunk_size_history():
+    chunk_size = AdaptiveChunkSize(initial=2 * MIB)
+    chunk_size.next_size()
+    chunk_size.next_size()
+    chunk_size.record(2 * MIB, 0.1)
+    chunk_size.next_size()
+    assert chunk_size.history == [2 * MIB, 4 * MIB]
+
+
+def test_upload_chunks_adaptive(tmp_path):
+    data = bytes(range(256)) * (5 * MIB // 256)
+    path = tmp_path / "file.dat"
+    path.write_bytes(data)
+    chunk_size = AdaptiveChunkSize(initial=MIB, min_size=MIB, max_size=2 * MIB)
+    receiver = Receiver()
+    digest = upload_chunks(str(path), chunk_size, receiver, concurrency=1)
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert receiver.data() == data
+    assert chunk_size.history == [MIB, 2 * MIB]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(upload.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(upload.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_rate_limit_burst(clock):
+    rate_limit = RateLimit(1000)
+    rate_limit.acquire(600)
+    rate_limit.acquire(400)
+    assert clock.sleeps == []
+    rate_limit.acquire(500)
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_rate_limit_refills(clock):
+    rate_limit = RateLimit(1000)
+    rate_limit.acquire(1000)
+    clock.now += 2.0
+    # The bucket holds no more than the burst.
+    rate_limit.acquire(1000)
+    rate_limit.acquire(500)
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_rate_limit_credit(clock):
+    rate_limit = RateLimit(1000, burst=100)
+    rate_limit.acquire(2100)
+    assert clock.sleeps == [pytest.approx(2.0)]
+    rate_limit.acquire(100)
+    assert clock.sleeps == [pytest.approx(2.0), pytest.approx(0.1)]
+
+
+def test_rate_limit_from_param():
+    assert rate_limit_from_param(None) is None
+    assert rate_limit_from_param("2MB").rate == 2 * MIB
+    with pytest.raises(ValueError):
+        rate_limit_from_param("0")
+
+
+def test_upload_chunks_rate_limit(no_sleep, data_file):
+    path, data = data_file
+    amounts = []
+    rate_limit = RateLimit(1000)
+    rate_limit.acquire = amounts.append
+    receiver = Receiver(failures={0: 1})
+    upload_chunks(path, 1000, receiver, concurrency=1, retries=1, rate_limit=rate_limit)
+    assert receiver.data() == data
+    # Every chunk sent counts, including the one retried.
+    assert sum(amounts) == len(data) + 1000
+
+
+UPLOAD_PARAMS = {
+    "pulp_url": "https://pulp.example.org",
+    "upload_concurrency": 2,
+    "upload_retries": 1,
+    "resume_upload": True,
+    "upload_lock": True,
+    "upload_lock_dir": "/tmp/locks",
+}
+
+
+def test_upload_options():
+    options = upload_options(UPLOAD_PARAMS, "0" * 64, 1000, None)
+    assert options["chunk_size"] == 1000
+    assert options["upload_concurrency"] == 2
+    assert options["upload_retries"] == 1
+    assert options["resumable"] is not None
+    assert isinstance(options["upload_lock"], UploadLock)
+
+
+def test_upload_options_without_digest():
+    options = upload_options(UPLOAD_PARAMS, None, 1000, None)
+    assert options["resumable"] is None
+    assert options["upload_lock"] is None
+
+
+def test_upload_options_check_mode():
+    assert (
+        upload_options(UPLOAD_PARAMS, "0" * 64, 1000, None, check_mode=True)["upload_lock"] is None
+    )
+
+
+def test_locked_upload(tmp_path):
+    lock = UploadLock(str(tmp_path), "0" * 64)
+    assert locked_upload(None, lambda: "found", lambda: "uploaded") == ("uploaded", True)
+    assert locked_upload(lock, lambda: None, lambda: "uploaded") == ("uploaded", True)
+    # Another host uploaded the file while waiting for the lock.
+    assert locked_upload(lock, lambda: "found", lambda: "uploaded") == ("found", False)
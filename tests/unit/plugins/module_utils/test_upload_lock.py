@@ -0,0 +1,47 @@
+import multiprocessing
+import os
+import time
+
+from ansible_collections.pulp.squeezer.plugins.module_utils.upload_lock import UploadLock
+
+SHA256 = "0" * 64
+
+
+def hold_lock(directory, locked, seconds):
+    with UploadLock(directory, SHA256):
+        locked.set()
+        time.sleep(seconds)
+
+
+def test_default_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    with UploadLock(None, SHA256) as lock:
+        assert lock.path == str(tmp_path / "squeezer" / "locks" / (SHA256 + ".lock"))
+        assert os.path.exists(lock.path)
+
+
+def test_lock_excludes_other_processes(tmp_path):
+    context = multiprocessing.get_context("fork")
+    locked = context.Event()
+    process = context.Process(target=hold_lock, args=(str(tmp_path), locked, 0.5))
+    process.start()
+    try:
+        assert locked.wait(10)
+        start = time.monotonic()
+        with UploadLock(str(tmp_path), SHA256):
+            waited = time.monotonic() - start
+    finally:
+        process.join()
+    assert waited > 0.2
+
+
+def test_lock_is_released(tmp_path):
+    with UploadLock(str(tmp_path), SHA256):
+        pass
+    # A lock released by this process can be taken by another one right away.
+    context = multiprocessing.get_context("fork")
+    locked = context.Event()
+    process = context.Process(target=hold_lock, args=(str(tmp_path), locked, 0))
+    process.start()
+    process.join(10)
+    assert locked.is_set()
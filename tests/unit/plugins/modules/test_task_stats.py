@@ -0,0 +1,28 @@
+import pytest
+from ansible_collections.pulp.squeezer.plugins.modules.task_stats import Histogram
+
+
+@pytest.mark.parametrize("value", [0.0015, 0.05, 0.3, 0.9, 1.0, 2.5, 120.0])
+def test_percentile_precision(value):
+    histogram = Histogram(precision=0.01)
+    for _ in range(10):
+        histogram.add(value)
+    histogram.add(value * 1000)
+    assert histogram.percentile(50) == pytest.approx(value, rel=0.01)
+
+
+def test_sub_second_buckets_are_distinct():
+    histogram = Histogram(precision=0.01)
+    for value in [0.3, 0.9, 1.1, 3.0]:
+        histogram.add(value)
+    assert len(histogram.buckets) == 4
+    assert histogram.percentile(25) == pytest.approx(0.3, rel=0.01)
+    assert histogram.percentile(50) == pytest.approx(0.9, rel=0.01)
+
+
+def test_below_a_millisecond():
+    histogram = Histogram()
+    histogram.add(0.0)
+    histogram.add(-1.0)
+    assert histogram.percentile(100) == 0.0
+    assert histogram.summary([50]) == {"p50": 0.0, "mean": 0.0, "max": 0.0}
@@ -0,0 +1,115 @@
+import hashlib
+import types
+
+import pytest
+from ansible.errors import AnsibleError
+from ansible.plugins.action import ActionBase
+from ansible_collections.pulp.squeezer.plugins.action import artifact, file_content
+from ansible_collections.pulp.squeezer.plugins.plugin_utils.controller_upload import (
+    ControllerUploadAction,
+    connection_params,
+    upload_params,
+)
+
+SHA256 = "0" * 64
+ARTIFACT_HREF = "/pulp/api/v3/artifacts/0123/"
+
+
+def test_connection_params_from_args(monkeypatch):
+    monkeypatch.setenv("SQUEEZER_PULP_URL", "https://other.example.org")
+    params = connection_params(
+        {"pulp_url": "https://pulp.example.org", "username": "admin", "validate_certs": "no"}
+    )
+    assert params["pulp_url"] == "https://pulp.example.org"
+    assert params["username"] == "admin"
+    assert params["validate_certs"] is False
+    assert params["timeout"] == 10
+
+
+def test_connection_params_from_environment(monkeypatch):
+    monkeypatch.setenv("SQUEEZER_PULP_URL", "https://pulp.example.org")
+    monkeypatch.setenv("SQUEEZER_USERNAME", "admin")
+    monkeypatch.setenv("SQUEEZER_PASSWORD", "password")
+    monkeypatch.setenv("SQUEEZER_VALIDATE_CERTS", "false")
+    params = connection_params({})
+    assert params["pulp_url"] == "https://pulp.example.org"
+    assert params["username"] == "admin"
+    assert params["password"] == "password"
+    assert params["validate_certs"] is False
+
+
+def test_upload_params():
+    params = upload_params({"upload_retries": "5", "upload_lock_dir": "~/locks", "file": "x"})
+    assert params["upload_retries"] == 5
+    assert params["upload_concurrency"] == 4
+    assert params["upload_lock_dir"].endswith("/locks")
+    assert not params["upload_lock_dir"].startswith("~")
+    assert "file" not in params
+
+
+def test_upload_params_invalid():
+    with pytest.raises(AnsibleError):
+        upload_params({"upload_retries": "many"})
+
+
+def test_abstract():
+    with pytest.raises(TypeError):
+        ControllerUploadAction(None, None, None, None, None, None)
+
+
+def test_artifact_module_args():
+    action = artifact.ActionModule.__new__(artifact.ActionModule)
+    args = {"file": "data/file.dat", "remote_src": False, "state": "present"}
+    assert action.module_args(args, SHA256, ARTIFACT_HREF) == {
+        "sha256": SHA256,
+        "remote_src": False,
+        "state": "present",
+    }
+    assert "file" in args
+
+
+def test_file_content_module_args():
+    action = file_content.ActionModule.__new__(file_content.ActionModule)
+    args = {
+        "file": "data/file.dat",
+        "relative_path": "file.dat",
+        "repository": "test",
+        "remote_src": False,
+        "state": "present",
+    }
+    assert action.module_args(args, SHA256, ARTIFACT_HREF) == {
+        "sha256": SHA256,
+        "artifact": ARTIFACT_HREF,
+        "relative_path": "file.dat",
+        "repository": "test",
+        "remote_src": False,
+        "state": "present",
+    }
+
+
+@pytest.mark.parametrize("state", ["absent", None])
+def test_controller_file_digest(monkeypatch, tmp_path, state):
+    path = tmp_path / "file.dat"
+    path.write_bytes(b"squeezer")
+    monkeypatch.setattr(ActionBase, "run", lambda self, tmp=None, task_vars=None: {})
+    action = artifact.ActionModule.__new__(artifact.ActionModule)
+    action._task = types.SimpleNamespace(
+        args={"file": "file.dat", "remote_src": False, "state": state}
+    )
+    action._find_needle = lambda dirname, needle: str(path)
+    calls = []
+
+    def _execute_module(module_args, task_vars):
+        calls.append(module_args)
+        return {"changed": False}
+
+    action._execute_module = _execute_module
+    assert action.run(task_vars={}) == {"changed": False}
+    # The file itself is only on the controller.
+    assert calls == [
+        {
+            "sha256": hashlib.sha256(b"squeezer").hexdigest(),
+            "remote_src": False,
+            "state": state,
+        }
+    ]
@@ -4,7 +4,9 @@ import json
 import os
 import re
 import sys
+import threading
 
+import requests
 import vcr
 
 try:
@@ -98,6 +100,18 @@ else:
 
     amp_vcr.register_matcher("amp_body", amp_body_matcher)
 
+    if test_params["record_mode"] != "none":
+        # While sending a request to record it, vcr removes its patches for all threads.
+        # Requests sent concurrently would bypass the cassette, so they are sent one by one.
+        send_lock = threading.Lock()
+        adapter_send = requests.adapters.HTTPAdapter.send
+
+        def locked_send(self, *args, **kwargs):
+            with send_lock:
+                return adapter_send(self, *args, **kwargs)
+
+        requests.adapters.HTTPAdapter.send = locked_send
+
     with amp_vcr.use_cassette(
         cassette_file,
         record_mode=test_params["record_mode"],